@@ -0,0 +1,2 @@
+default_app_config = 'django_schema.apps.DjangoSchemaConfig'
+__version__ = '0.1'
@@ -1,11 +1,26 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import AppsAndModelsList
+from .views import AppsAndModelsList, AsyncAppsAndModelsList, AsyncModelSchemas, FieldChoicesList, ModelChoicesList, \
+    ModelSchemaProfile, SchemaFingerprints, SchemaProfileDetail, SchemaReadiness, \
+    SchemaRegistryStats
 
 router = DefaultRouter()
 
 urlpatterns = [
-    path('apps-and-models', AppsAndModelsList.as_view())
+    path('apps-and-models', AppsAndModelsList.as_view()),
+    path('choices/<app_name>/<model_name>/<field_name>', ModelChoicesList.as_view(), name='model-choices'),
+    path('async/apps-and-models', AsyncAppsAndModelsList.as_view()),
+    path('async/schemas', AsyncModelSchemas.as_view(), name='async-schemas'),
+    path('async/schemas/style/<style>', AsyncModelSchemas.as_view(), name='async-schemas-style'),
+    path('field-choices/<app_name>/<model_name>/<field_name>', FieldChoicesList.as_view(), name='field-choices'),
+    path('profile/<app_name>/<model_name>', ModelSchemaProfile.as_view(), name='model-profile'),
+    path('profile/<app_name>/<model_name>/style/<style>', ModelSchemaProfile.as_view(), name='model-profile-style'),
+    path('profiles/<profile_id>', SchemaProfileDetail.as_view(), name='profile-detail'),
+    path('registry-stats', SchemaRegistryStats.as_view(), name='registry-stats'),
+    path('ready', SchemaReadiness.as_view(), name='ready'),
+    path('fingerprints', SchemaFingerprints.as_view(), name='fingerprints'),
+    path('fingerprints/<app_name>', SchemaFingerprints.as_view(), name='app-fingerprints'),
+    path('fingerprints/<app_name>/<model_name>', SchemaFingerprints.as_view(), name='model-fingerprints'),
 ]
 urlpatterns += router.urls
@@ -1,7 +1,93 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
+from django.utils.module_loading import import_string
+from django.utils.http import quote_etag
+from django.views.generic import View
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..views import get_apps_and_models
+from ..app_index import get_app_model_index
+from ..choices import DEFAULT_PAGE_SIZE, get_choices_page, get_relation_field, get_static_choices, \
+    get_static_choices_field
+from ..compiler import compile_model_schema, schema_registry
+from ..defaults import fill_callable_defaults, get_schema_etag
+from ..delta import delta_response
+from ..encoders import JSON_CONTENT_TYPE, encode_json
+from ..fingerprints import get_app_node, get_model_node, get_root_node
+from ..http import conditional_response, get_data_etag
+from ..profiling import ProfilerBusy, get_busy_response, get_profile_url, is_profiling_allowed, load_profile, \
+    profile_call, profiled, store_profile
+from ..relations import get_related_models, get_relation_depth
+from ..timing import phase, server_timing
+from ..views import ModelsOfLocalApp, get_apps_and_models, get_local_apps
+from ..warmup import schema_warm_up, start_warm_up
+
+DEFAULT_ASYNC_WORKERS = 4
+
+_schema_executor = None
+_schema_executor_lock = threading.Lock()
+
+
+def get_schema_executor():
+    """
+    Thread pool of the async views, introspection is blocking Django code. The size is set by SCHEMA_ASYNC_WORKERS.
+    """
+    global _schema_executor
+    if _schema_executor is None:
+        with _schema_executor_lock:
+            if _schema_executor is None:
+                max_workers = getattr(settings, 'SCHEMA_ASYNC_WORKERS', DEFAULT_ASYNC_WORKERS)
+                _schema_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='django_schema')
+    return _schema_executor
+
+
+def get_permission_classes(setting_name, default):
+    """
+    :param setting_name: setting holding the dotted paths of the permission classes
+    :param default: permission classes used when the setting is not set
+    :return: permission classes
+    """
+    paths = getattr(settings, setting_name, None)
+    if paths is None:
+        return default
+    return [import_string(path) for path in paths]
+
+
+def get_choices_permission_classes():
+    """
+    :return: permission classes of the model choices endpoint, SCHEMA_CHOICES_PERMISSION_CLASSES, authenticated users
+    by default
+    """
+    return get_permission_classes('SCHEMA_CHOICES_PERMISSION_CLASSES', [IsAuthenticated])
+
+
+def get_internal_permission_classes():
+    """
+    :return: permission classes of the endpoints exposing the internals of the process,
+    SCHEMA_INTERNAL_PERMISSION_CLASSES, staff users by default
+    """
+    return get_permission_classes('SCHEMA_INTERNAL_PERMISSION_CLASSES', [IsAdminUser])
+
+
+def get_apps_and_model_names():
+    """
+    :return: {app name: [model name]}
+    """
+    apps_and_models = {}
+    for app, _models in get_apps_and_models().items():
+        models = []
+        if _models:
+            models = [model.__name__ for model in _models]
+        apps_and_models.update({app:models})
+    return apps_and_models
 
 
 class AppsAndModelsList(APIView):
@@ -9,14 +95,258 @@ class AppsAndModelsList(APIView):
     Return all the apps and models from the application
     """
 
+    @profiled
     def get(self, request, format=None):
         """
         """
 
-        apps_and_models = {}
-        for app, _models in get_apps_and_models().items():
-            models = []
-            if _models:
-                models = [model.__name__ for model in _models]
-            apps_and_models.update({app:models})
-        return Response(apps_and_models)
+        apps_and_models = get_apps_and_model_names()
+        return conditional_response(request, Response(apps_and_models), schema_registry.last_modified,
+                                    'SCHEMA_APPS_CACHE_CONTROL', etag=get_data_etag(apps_and_models))
+
+
+class AsyncAppsAndModelsList(View):
+    """
+    Async version of AppsAndModelsList for ASGI deployments, needs Django 3.1+
+    """
+
+    async def get(self, request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        apps_and_models = await loop.run_in_executor(get_schema_executor(), get_apps_and_model_names)
+        response = HttpResponse(encode_json(apps_and_models), content_type=JSON_CONTENT_TYPE)
+        return conditional_response(request, response, schema_registry.last_modified,
+                                    'SCHEMA_APPS_CACHE_CONTROL', etag=get_data_etag(apps_and_models))
+
+
+class AsyncModelSchemas(View):
+    """
+    Schema of every field of several models, ?model=blog.Post&model=blog.Category
+    The models are generated concurrently on the SCHEMA_ASYNC_WORKERS thread pool and returned keyed by model label in
+    the requested order. Needs Django 3.1+
+    ?depth=<n> adds the models of the SCHEMA_APPS reachable within n relations, once for the whole response:
+    {"schemas": {label: schema}, "related": {label: schema}}, ?reverse=1 follows the reverse relations too.
+    """
+    schema_view_class = ModelsOfLocalApp
+
+    def get_models(self, labels):
+        """
+        :param labels: "app_label.ModelName" of models of the SCHEMA_APPS
+        :return: list of (label, model)
+        """
+        index = get_app_model_index()
+        _models = []
+        with phase('lookup'):
+            for label in labels:
+                try:
+                    model = index.get_model_by_label(label)
+                except LookupError as e:
+                    raise Http404(str(e))
+                if not index.is_local_app(model._meta.app_label):
+                    raise Http404(f"this is no such model {label}")
+                _models.append((label, model))
+        return _models
+
+    def get_related_models(self, _models, depth, reverse=False):
+        """
+        :param _models: list of (label, model) of the requested models
+        :return: list of the related models of the SCHEMA_APPS which are not requested
+        """
+        index = get_app_model_index()
+        requested = {model for label, model in _models}
+        related = {}
+        for label, model in _models:
+            for related_model in get_related_models(model, depth, reverse):
+                if related_model not in requested and index.is_local_app(related_model._meta.app_label):
+                    related[related_model] = None
+        return list(related)
+
+    def get_model_schema(self, schema_view, model, format_style=None):
+        """
+        :return: schema encoded as JSON
+        """
+        compiled_schema = schema_registry.get_compiled_schema(model._meta.app_config, model, schema_view)
+        return compiled_schema.get_encoded(format_style=format_style)[0]
+
+    @server_timing
+    async def get(self, request, *args, **kwargs):
+        schema_style = kwargs.get('style', None)
+        try:
+            depth = get_relation_depth(request.GET.get('depth'))
+        except ValueError:
+            return HttpResponseBadRequest("depth must be a number")
+        # dict keeps the first position of repeated labels
+        _models = self.get_models(dict.fromkeys(request.GET.getlist('model')))
+        related_models = self.get_related_models(_models, depth, bool(request.GET.get('reverse'))) if depth else []
+        schema_view = self.schema_view_class()
+        loop = asyncio.get_running_loop()
+        executor = get_schema_executor()
+        # gather returns the results in the order of the models whatever order they finish in,
+        # each call runs in a copy of the context so the worker threads record in the Server-Timing of the request
+        schemas = await asyncio.gather(*[
+            loop.run_in_executor(executor, contextvars.copy_context().run, self.get_model_schema, schema_view, model,
+                                 schema_style)
+            for model in [model for label, model in _models] + related_models
+        ])
+        # the encoded schemas are joined as they are, only the labels are encoded
+        content = b'{' + b','.join(
+            encode_json(label) + b':' + schema for (label, model), schema in zip(_models, schemas)
+        ) + b'}'
+        if depth:
+            related = b','.join(encode_json(model._meta.label) + b':' + schema
+                                for model, schema in zip(related_models, schemas[len(_models):]))
+            content = b'{"schemas":' + content + b',"related":{' + related + b'}}'
+        response = HttpResponse(fill_callable_defaults(content), content_type=JSON_CONTENT_TYPE)
+        response['ETag'] = get_schema_etag(content)
+        return delta_response(request, response, schema_registry.last_modified, 'SCHEMA_MODEL_CACHE_CONTROL')
+
+
+class ModelChoicesList(APIView):
+    """
+    Return a page of the choices of a ModelChoiceField or ModelMultipleChoiceField of a model of the SCHEMA_APPS
+    ?q=<label prefix>&cursor=<next of the previous page>&limit=<page size>
+    The pages hold database rows, so the endpoint needs the SCHEMA_CHOICES_PERMISSION_CLASSES and the related model
+    must belong to the SCHEMA_APPS or be listed in SCHEMA_CHOICES_MODELS.
+    """
+
+    def get_permissions(self):
+        return [permission() for permission in get_choices_permission_classes()]
+
+    def get(self, request, app_name, model_name, field_name, format=None):
+        if not get_app_model_index().is_local_app(app_name):
+            raise NotFound(f"this is no such app {app_name}")
+        try:
+            field = get_relation_field(app_name, model_name, field_name)
+        except LookupError as e:
+            raise NotFound(str(e))
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+            page = get_choices_page(field,
+                                    search=request.query_params.get('q'),
+                                    cursor=request.query_params.get('cursor'),
+                                    limit=limit)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        return Response(page)
+
+
+class FieldChoicesList(APIView):
+    """
+    Return the static choices of a field of a model of the SCHEMA_APPS, referenced by the schema when the list is
+    longer than SCHEMA_CHOICES_INLINE_LIMIT. ?widget=1 returns the choices of the form widget, ?base=1 the choices of the
+    base field of an ArrayField.
+    """
+
+    def get(self, request, app_name, model_name, field_name, format=None):
+        if not get_app_model_index().is_local_app(app_name):
+            raise NotFound(f"this is no such app {app_name}")
+        widget = bool(request.query_params.get('widget'))
+        try:
+            field = get_static_choices_field(app_name, model_name, field_name, widget=widget,
+                                             base=bool(request.query_params.get('base')))
+        except LookupError as e:
+            raise NotFound(str(e))
+        choices = list(get_static_choices(field, widget=widget))
+        return conditional_response(request, Response(choices), schema_registry.last_modified,
+                                    'SCHEMA_CHOICES_CACHE_CONTROL', etag=get_data_etag(choices))
+
+
+class SchemaFingerprints(APIView):
+    """
+    Node of the schema fingerprint tree: the project with the hash of each app, an app with the hash of each model or
+    a model with the hash of each field. The ETag is the hash of the node.
+    The tree names every app, model and field of the SCHEMA_APPS, so it needs the SCHEMA_INTERNAL_PERMISSION_CLASSES.
+    """
+
+    def get_permissions(self):
+        return [permission() for permission in get_internal_permission_classes()]
+
+    def get(self, request, app_name=None, model_name=None, format=None):
+        local_apps = get_local_apps()
+        if app_name is None:
+            node = get_root_node(local_apps)
+        elif app_name not in local_apps:
+            raise NotFound(f"this is no such app {app_name}")
+        else:
+            try:
+                node = get_model_node(app_name, model_name) if model_name else get_app_node(app_name)
+            except LookupError as e:
+                raise NotFound(str(e))
+        return conditional_response(request, Response(node), schema_registry.last_modified,
+                                    'SCHEMA_MODEL_CACHE_CONTROL', etag=quote_etag(node['hash']))
+
+
+class SchemaReadiness(APIView):
+    """
+    Progress of the schema warm-up, 503 until every model of the SCHEMA_APPS is compiled when SCHEMA_WARM_UP is set.
+    Models which are not warmed yet are still compiled on demand.
+    """
+
+    def get(self, request, format=None):
+        # the probe may be the first request of the process
+        start_warm_up()
+        progress = schema_warm_up.get_progress()
+        response_status = status.HTTP_200_OK if progress['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE
+        return Response(progress, status=response_status, headers={'Cache-Control':'no-store'})
+
+
+class ModelSchemaProfile(APIView):
+    """
+    Profile of the compilation of one model in one style without the compiled schema registry, so the full cost of a
+    slow model is measured in place. Staff only, needs SCHEMA_PROFILING. ?store=1 stores the report for download.
+    """
+    schema_view_class = ModelsOfLocalApp
+
+    def get(self, request, app_name, model_name, style=None, format=None):
+        if not is_profiling_allowed(request):
+            raise NotFound()
+        index = get_app_model_index()
+        if not index.is_local_app(app_name):
+            raise NotFound(f"this is no such app {app_name}")
+        try:
+            app_config = index.get_app_config(app_name)
+            model = index.get_model(app_name, model_name)
+        except LookupError as e:
+            raise NotFound(str(e))
+        try:
+            schema, report, stats = profile_call(self.get_model_schema, app_config, model, style)
+        except ProfilerBusy:
+            return get_busy_response()
+        data = {'profile':report}
+        if request.query_params.get('store'):
+            data['url'] = get_profile_url(store_profile(report, stats))
+        return Response(data, headers={'Cache-Control':'no-store'})
+
+    def get_model_schema(self, app_config, model, style=None):
+        compiled_schema = compile_model_schema(app_config, model, self.schema_view_class())
+        return compiled_schema.get_encoded(format_style=style)[0]
+
+
+class SchemaProfileDetail(APIView):
+    """
+    Stored profile as json, ?download=1 downloads the data of ``pstats.Stats``. Staff only, needs SCHEMA_PROFILING.
+    """
+
+    def get(self, request, profile_id, format=None):
+        if not is_profiling_allowed(request):
+            raise NotFound()
+        profile = load_profile(profile_id)
+        if profile is None:
+            raise NotFound(f"this is no such profile {profile_id}")
+        if request.query_params.get('download'):
+            response = HttpResponse(profile['stats'], content_type='application/octet-stream')
+            response['Content-Disposition'] = f'attachment; filename="{profile_id}.pstats"'
+            return response
+        return Response(profile['report'], headers={'Cache-Control':'no-store'})
+
+
+class SchemaRegistryStats(APIView):
+    """
+    Entries, approximate memory footprint and hit, miss and eviction counts of the compiled schema registry.
+    Needs the SCHEMA_INTERNAL_PERMISSION_CLASSES.
+    """
+
+    def get_permissions(self):
+        return [permission() for permission in get_internal_permission_classes()]
+
+    def get(self, request, format=None):
+        return Response(schema_registry.get_stats(), headers={'Cache-Control':'no-store'})
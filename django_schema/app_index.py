@@ -0,0 +1,150 @@
+"""
+Index of the installed apps and models, built once per app registry state and SCHEMA_APPS.
+
+Apps are found by label, full name (``apps.v1.blog``) or short name. The short name is the full name without the
+version prefix matched by one of the SCHEMA_APP_VERSION_PREFIXES regular expressions, by default everything up to
+``apps.v1.``::
+
+    SCHEMA_APP_VERSION_PREFIXES = [r'apps\.v\d+\.']
+
+Models are found by case insensitive name or ``app_label.ModelName`` label.
+"""
+import difflib
+import re
+import threading
+
+from django.apps import apps
+from django.conf import settings
+
+DEFAULT_VERSION_PREFIXES = [r'.*apps\.v1\.']
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_version_prefixes():
+    return getattr(settings, 'SCHEMA_APP_VERSION_PREFIXES', DEFAULT_VERSION_PREFIXES)
+
+
+def strip_version_prefix(app_name, patterns):
+    """
+    :param app_name: full name of the app, 'apps.v1.blog'
+    :param patterns: compiled version prefix patterns
+    :return: short name of the app, 'blog'
+    """
+    for pattern in patterns:
+        match = pattern.match(app_name)
+        if match:
+            return app_name[match.end():]
+    return app_name
+
+
+def get_lookup_error(kind, name, candidates):
+    close_matches = difflib.get_close_matches(name, candidates, n=3)
+    hint = f", did you mean {', '.join(close_matches)}?" if close_matches else ''
+    return LookupError(f"this is no such {kind} {name}{hint}")
+
+
+class AppModelIndex(object):
+    """
+    App configs and models of the project keyed by every name they are requested with.
+    """
+
+    def __init__(self, local_apps, version_prefixes):
+        self.key = (tuple(local_apps), tuple(version_prefixes))
+        self.patterns = [re.compile(prefix) for prefix in version_prefixes]
+        # label, full name and short name -> AppConfig
+        self.app_configs = {}
+        # (app label, lower case model name) and lower case model label -> model
+        self.models = {}
+        for app_config in apps.get_app_configs():
+            self.app_configs.setdefault(self.format_app_name(app_config.name), app_config)
+            self.app_configs[app_config.name] = app_config
+            for model in app_config.get_models():
+                self.models[(app_config.label, model._meta.model_name)] = model
+                self.models[model._meta.label_lower] = model
+        # labels override the names, as in the app registry
+        for app_config in apps.get_app_configs():
+            self.app_configs[app_config.label] = app_config
+
+        # short name of the SCHEMA_APPS -> models, in the order of the setting
+        self.local_apps = {}
+        self.local_labels = set()
+        for name in local_apps:
+            short_name = self.format_app_name(name)
+            app_config = self.app_configs.get(short_name) or self.app_configs.get(name)
+            if app_config is None:
+                raise get_lookup_error('app in SCHEMA_APPS', name, list(self.app_configs))
+            self.local_apps[short_name] = tuple(app_config.get_models())
+            self.local_labels.add(app_config.label)
+
+    def format_app_name(self, app_name):
+        return strip_version_prefix(app_name, self.patterns)
+
+    def get_app_config(self, app_name):
+        """
+        :param app_name: label, full name or short name
+        :raise LookupError: unknown app
+        """
+        try:
+            return self.app_configs[app_name]
+        except KeyError:
+            raise get_lookup_error('app', app_name, list(self.app_configs))
+
+    def get_model(self, app_name, model_name):
+        """
+        :param app_name: label, full name or short name
+        :param model_name: case insensitive name of the model
+        :raise LookupError: unknown app or model
+        """
+        app_config = self.get_app_config(app_name)
+        try:
+            return self.models[(app_config.label, model_name.lower())]
+        except KeyError:
+            raise get_lookup_error(f'model in {app_config.label}', model_name,
+                                   [model.__name__ for model in app_config.get_models()])
+
+    def get_model_by_label(self, label):
+        """
+        :param label: 'app_label.ModelName', case insensitive
+        :raise LookupError: unknown or malformed label
+        """
+        try:
+            return self.models[label.lower()]
+        except KeyError:
+            raise get_lookup_error('model', label, [model._meta.label for model in apps.get_models()])
+
+    def is_local_app(self, app_name):
+        """
+        :param app_name: short name or label
+        """
+        return app_name in self.local_apps or app_name in self.local_labels
+
+    def get_local_apps(self):
+        return list(self.local_apps)
+
+    def get_apps_and_models(self):
+        return {name:list(_models) for name, _models in self.local_apps.items()}
+
+
+def get_app_model_index():
+    """
+    :return: AppModelIndex of the current app registry, SCHEMA_APPS and SCHEMA_APP_VERSION_PREFIXES
+    """
+    global _index
+    key = (tuple(settings.SCHEMA_APPS), tuple(get_version_prefixes()))
+    index = _index
+    if index is None or index.key != key:
+        with _index_lock:
+            if _index is None or _index.key != key:
+                _index = AppModelIndex(*key)
+            index = _index
+    return index
+
+
+def clear_app_model_index(**kwargs):
+    """
+    Signal receiver, drops the index when models are registered or migrated.
+    """
+    global _index
+    _index = None
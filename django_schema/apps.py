@@ -1,5 +1,28 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.models.signals import class_prepared, post_migrate
 
 
 class DjangoSchemaConfig(AppConfig):
     name = 'django_schema'
+
+    def ready(self):
+        from .app_index import clear_app_model_index
+        from .choices import clear_static_choices_cache
+        from .compiler import schema_registry
+        from .forms import clear_model_form_cache
+        from .introspection import clear_field_listing_cache
+        from .json_schema import json_schema_style  # noqa: F401 registers the json-schema style
+        from .relations import clear_relation_graph
+        from .warmup import start_warm_up
+
+        # Compiled schemas, generated forms, field listings, choices, the app index and the relation graph are only
+        # valid for the current model definitions
+        for receiver in [schema_registry.clear, clear_model_form_cache, clear_field_listing_cache,
+                         clear_static_choices_cache, clear_app_model_index, clear_relation_graph]:
+            class_prepared.connect(receiver, dispatch_uid=f'{receiver.__qualname__}_on_class_prepared')
+            post_migrate.connect(receiver, dispatch_uid=f'{receiver.__qualname__}_on_post_migrate')
+
+        # started by the first request of each process, not at import time in the master of a preloading server or in
+        # the management commands
+        request_started.connect(start_warm_up, dispatch_uid='django_schema_start_warm_up')
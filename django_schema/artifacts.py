@@ -0,0 +1,183 @@
+"""
+Prebuilt schema artifacts written by the ``build_schema`` management command.
+
+Layout of the build directory (``SCHEMA_BUILD_DIR`` setting)::
+
+    manifest.json
+    <app_name>.<style>.json             schema of every model of the app
+    <app_name>/<ModelName>.<style>.json schema of every field of the model
+
+When the manifest exists the compiled schema registry loads schemas from the files instead of introspecting models.
+Models changed after the build are compiled live.
+"""
+import hashlib
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.migrations.writer import MigrationWriter
+
+from .compiler import DEFAULT_STYLE, CompiledModelSchema, get_schema_fields, get_schema_styles
+
+# Bump when the structure of the generated schema changes so every model is rebuilt
+ARTIFACT_VERSION = 4
+MANIFEST_NAME = 'manifest.json'
+
+logger = logging.getLogger(__name__)
+
+
+def get_build_dir():
+    return getattr(settings, 'SCHEMA_BUILD_DIR', None)
+
+
+def get_builder_path(builder):
+    return f'{builder.__class__.__module__}.{builder.__class__.__qualname__}'
+
+
+def get_model_definition_hash(model):
+    """
+    Hash of the model definition, made from the deconstructed fields like the migration autodetector does.
+    :param model: Model object
+    :return: hex digest
+    """
+    definition = [str(ARTIFACT_VERSION), model._meta.label, model._meta.app_config.name]
+    for f in get_schema_fields(model):
+        deconstructed = f.deconstruct()
+        try:
+            definition.append(MigrationWriter.serialize(deconstructed)[0])
+        except ValueError:
+            definition.append(repr(deconstructed))
+    return hashlib.sha1('\n'.join(definition).encode('utf-8')).hexdigest()
+
+
+def get_style_schema(compiled_schema, style):
+    return compiled_schema.project(format_style=style)
+
+
+class ArtifactStore(object):
+    """
+    Read and write the schema artifacts of a build directory.
+    """
+
+    def __init__(self, build_dir):
+        self.build_dir = build_dir
+        self._manifest = None
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            self._manifest = self.read_json(MANIFEST_NAME) or {'version':ARTIFACT_VERSION, 'models':{}, 'apps':{}}
+        return self._manifest
+
+    def get_path(self, name):
+        return os.path.join(self.build_dir, name)
+
+    def read_json(self, name):
+        try:
+            with open(self.get_path(name), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_json(self, name, data):
+        path = self.get_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, cls=DjangoJSONEncoder)
+        os.replace(tmp_path, path)
+
+    def get_model_file(self, app_name, model_name, style):
+        return os.path.join(app_name, f'{model_name}.{style}.json')
+
+    def get_app_file(self, app_name, style):
+        return f'{app_name}.{style}.json'
+
+    def load_compiled_schema(self, model, builder):
+        """
+        :return: CompiledModelSchema built from the artifacts, None when the model was not built by the same builder or
+        its definition changed since the build
+        """
+        if not self.is_compatible(builder):
+            return None
+        entry = self.manifest['models'].get(model._meta.label)
+        if entry is None:
+            return None
+        if entry['hash'] != get_model_definition_hash(model):
+            logger.warning("Schema artifact of %s is out of date, run build_schema. The schema is compiled live",
+                           model._meta.label)
+            return None
+        schemas = {}
+        for style in get_schema_styles():
+            # styles registered after the build are compiled on demand
+            schemas[style] = entry['files'].get(style) and self.read_json(entry['files'][style])
+            if schemas[style] is None:
+                return None
+        schema = schemas.pop(DEFAULT_STYLE)
+        return CompiledModelSchema(schema, schemas, entry['lookup'])
+
+    def is_model_current(self, model, definition_hash):
+        entry = self.manifest['models'].get(model._meta.label)
+        if entry is None or entry['hash'] != definition_hash or set(entry['files']) != set(get_schema_styles()):
+            return False
+        return all(os.path.exists(self.get_path(name)) for name in entry['files'].values())
+
+    def write_model(self, app_name, model, compiled_schema, definition_hash):
+        files = {}
+        for style in get_schema_styles():
+            name = self.get_model_file(app_name, model.__name__, style)
+            self.write_json(name, get_style_schema(compiled_schema, style))
+            files[style] = name
+        self.manifest['models'][model._meta.label] = {
+            'app_name':app_name,
+            'model_name':model.__name__,
+            'hash':definition_hash,
+            'lookup':compiled_schema.lookup,
+            'files':files,
+        }
+
+    def write_app(self, app_name, models):
+        files = {}
+        for style in get_schema_styles():
+            app_schema = {}
+            for model in models:
+                entry = self.manifest['models'][model._meta.label]
+                app_schema[model.__name__] = self.read_json(entry['files'][style])
+            name = self.get_app_file(app_name, style)
+            self.write_json(name, app_schema)
+            files[style] = name
+        self.manifest['apps'][app_name] = {
+            'models':[model._meta.label for model in models],
+            'files':files,
+        }
+
+    def is_app_current(self, app_name, models):
+        entry = self.manifest['apps'].get(app_name)
+        if entry is None or entry['models'] != [model._meta.label for model in models]:
+            return False
+        return all(os.path.exists(self.get_path(name)) for name in entry['files'].values())
+
+    def remove_files(self, entry):
+        for name in entry['files'].values():
+            if os.path.exists(self.get_path(name)):
+                os.remove(self.get_path(name))
+
+    def remove_model(self, label):
+        self.remove_files(self.manifest['models'].pop(label))
+
+    def remove_app(self, app_name):
+        self.remove_files(self.manifest['apps'].pop(app_name))
+
+    def is_compatible(self, builder):
+        """
+        :return: False when the artifacts were built by another version or another builder
+        """
+        return (self.manifest.get('version') == ARTIFACT_VERSION and
+                self.manifest.get('builder') == get_builder_path(builder))
+
+    def write_manifest(self, builder):
+        self.manifest['version'] = ARTIFACT_VERSION
+        self.manifest['builder'] = get_builder_path(builder)
+        self.write_json(MANIFEST_NAME, self.manifest)
@@ -0,0 +1,217 @@
+"""
+Benchmark of the schema views on synthetic models, used by the ``benchmark_schema`` management command.
+
+Synthetic models are registered on the ``django_schema`` app for the duration of a run. Every model has a field of each
+type handled by ``get_html_element_data`` and the first model is the target of the relations of the other models.
+"""
+import gc
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import models
+from django.test import RequestFactory, override_settings
+
+from .app_index import clear_app_model_index
+from .choices import clear_static_choices_cache
+from .compiler import schema_registry
+from .forms import clear_model_form_cache
+from .introspection import clear_field_listing_cache
+from .relations import clear_relation_graph
+
+BENCHMARK_APP = 'django_schema'
+
+CHOICES = [(f'choice_{i}', f'Choice {i}') for i in range(10)]
+
+
+def get_field_factories(target):
+    """
+    :param target: model class the relations point to, None for the first model
+    :return: list of callables returning a new model field
+    """
+    factories = [
+        lambda:models.CharField(max_length=100, help_text="Char field"),
+        lambda:models.CharField(max_length=20, choices=CHOICES),
+        lambda:models.TextField(blank=True),
+        lambda:models.EmailField(),
+        lambda:models.URLField(),
+        lambda:models.SlugField(),
+        lambda:models.IntegerField(default=0),
+        lambda:models.BigIntegerField(null=True),
+        lambda:models.PositiveIntegerField(default=1),
+        lambda:models.FloatField(null=True),
+        lambda:models.DecimalField(max_digits=10, decimal_places=2, null=True),
+        lambda:models.BooleanField(default=False),
+        lambda:models.DateField(null=True),
+        lambda:models.DateTimeField(null=True),
+        lambda:models.TimeField(null=True),
+        lambda:models.DurationField(null=True),
+        lambda:models.UUIDField(null=True),
+        lambda:models.GenericIPAddressField(null=True),
+        lambda:models.FileField(null=True),
+    ]
+    if target is not None:
+        factories += [
+            lambda:models.ForeignKey(target, on_delete=models.CASCADE, related_name='+'),
+            lambda:models.ManyToManyField(target, related_name='+'),
+        ]
+    return factories
+
+
+def create_model(name, field_count, target=None):
+    factories = get_field_factories(target)
+    attrs = {
+        '__module__':f'{BENCHMARK_APP}.models',
+        'Meta':type('Meta', (), {'app_label':BENCHMARK_APP}),
+    }
+    for i in range(field_count):
+        attrs[f'field_{i}'] = factories[i % len(factories)]()
+    return type(name, (models.Model,), attrs)
+
+
+@contextmanager
+def synthetic_app(model_count, field_count):
+    """
+    Register model_count models with field_count fields each on the benchmark app, they are removed on exit.
+    :return: list of the model classes
+    """
+    app_models = apps.all_models[BENCHMARK_APP]
+    registered = set(app_models)
+    _models = []
+    try:
+        for i in range(model_count):
+            target = _models[0] if _models else None
+            _models.append(create_model(f'BenchmarkModel{model_count}x{field_count}n{i}', field_count, target))
+        with override_settings(SCHEMA_APPS=[BENCHMARK_APP]):
+            yield _models
+    finally:
+        for name in set(app_models) - registered:
+            del app_models[name]
+        apps.clear_cache()
+        clear_caches()
+
+
+def clear_caches():
+    schema_registry.clear()
+    clear_model_form_cache()
+    clear_field_listing_cache()
+    clear_static_choices_cache()
+    clear_app_model_index()
+    clear_relation_graph()
+
+
+class Benchmark(object):
+    """
+    Time the schema views on a synthetic app of model_count models with field_count fields.
+    """
+
+    def __init__(self, model_count, field_count, repeat=20):
+        self.model_count = model_count
+        self.field_count = field_count
+        self.repeat = repeat
+        self.factory = RequestFactory()
+
+    def get_cases(self, _models):
+        from .api.views import AppsAndModelsList
+        from .views import ModelsOfLocalApp
+
+        model = _models[-1]
+        post_data = {'model-name':model.__name__}
+        post_data.update({f.attname:f.attname for f in model._meta.concrete_fields})
+        post_data.update({f.name:f.name for f in model._meta.many_to_many})
+
+        def get_context_data():
+            ModelsOfLocalApp().get_context_data(app_name=BENCHMARK_APP)
+
+        def schema_post(style=None):
+            kwargs = {'app_name':BENCHMARK_APP}
+            if style:
+                kwargs['style'] = style
+            response = ModelsOfLocalApp.as_view()(self.factory.post('/', post_data), **kwargs)
+            assert response.status_code == 200, response.status_code
+
+        def apps_and_models():
+            response = AppsAndModelsList.as_view()(self.factory.get('/'))
+            assert response.status_code == 200, response.status_code
+
+        return {
+            'get_context_data':(get_context_data, False),
+            'schema_post_default':(lambda:schema_post(), False),
+            'schema_post_one':(lambda:schema_post('one'), False),
+            'schema_post_json_schema':(lambda:schema_post('json-schema'), False),
+            'schema_post_default_cold':(lambda:schema_post(), True),
+            'schema_post_one_cold':(lambda:schema_post('one'), True),
+            'apps_and_models':(apps_and_models, False),
+        }
+
+    def measure(self, func, cold):
+        """
+        :param func: call to measure
+        :param cold: clear the compiled schemas, forms and field listings before every call
+        :return: latency in milliseconds and allocation peak in KiB per call
+        """
+        func()
+        timings = []
+        for _ in range(self.repeat):
+            if cold:
+                clear_caches()
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        if cold:
+            clear_caches()
+        # the process may already be tracing (python -X tracemalloc, profiling), it is left tracing
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            # the peak is measured from the current traced memory
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func()
+            peak = tracemalloc.get_traced_memory()[1] - current
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'min_ms':timings[0],
+            'median_ms':statistics.median(timings),
+            'p95_ms':timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            'peak_kib':peak / 1024,
+        }
+
+    def run(self, cases=None):
+        """
+        :param cases: names of the cases to run, all the cases when None
+        :return: {case name: measurements}
+        """
+        results = {}
+        with synthetic_app(self.model_count, self.field_count) as _models:
+            for name, (func, cold) in self.get_cases(_models).items():
+                if cases and name not in cases:
+                    continue
+                results[name] = self.measure(func, cold)
+        return results
+
+
+def compare_results(baseline, results, tolerance):
+    """
+    :param baseline: results of a previous run
+    :param results: results of this run
+    :param tolerance: allowed slowdown of the median latency, 0.25 is 25% slower
+    :return: list of (key, baseline median, median) of the regressions
+    """
+    regressions = []
+    for key, measurements in results.items():
+        if key not in baseline:
+            continue
+        base_median = baseline[key]['median_ms']
+        if measurements['median_ms'] > base_median * (1 + tolerance):
+            regressions.append((key, base_median, measurements['median_ms']))
+    return regressions
@@ -0,0 +1,268 @@
+"""
+Choices of the schema fields.
+
+Static choices (``choices=`` of a model field) are formatted once per field. Lists longer than
+SCHEMA_CHOICES_INLINE_LIMIT are replaced in the schema by a reference to the field choices resource, which is cached by
+the clients on its own ETag.
+
+Choices of ModelChoiceField and ModelMultipleChoiceField are served page by page. Pages use keyset pagination on
+(label, value) so every page is a range scan on the label column instead of an OFFSET over the whole related table,
+and only the value and label columns are selected.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.urls import NoReverseMatch, reverse
+
+from .app_index import get_app_model_index
+from .http import get_data_etag
+from .introspection import FieldSnapshot
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# (field, widget) -> formatted choices
+_static_choices = {}
+
+
+def format_choices(choices):
+    """
+    :param choices: iterable of (value, label)
+    :return: list of {"label", "value"}
+    """
+    options = []
+    for k, v in choices or []:
+        options.append({
+            "label":v,
+            "value":k,
+        })
+
+    return options
+
+
+def get_static_choices(field, widget=False, choices=None):
+    """
+    :param field: model field
+    :param widget: choices of the form widget of the field (with the blank choice) instead of the model field
+    :param choices: choices to format on the first call, loaded from the field when not given
+    :return: formatted choices, computed once per field
+    """
+    key = (field, widget)
+    try:
+        return _static_choices[key]
+    except KeyError:
+        pass
+    if choices is None:
+        choices = FieldSnapshot(field).widget.choices if widget else field.choices
+    formatted = _static_choices[key] = tuple(format_choices(choices))
+    return formatted
+
+
+def clear_static_choices_cache(**kwargs):
+    """
+    Signal receiver, drops the formatted static choices.
+    """
+    _static_choices.clear()
+
+
+def get_choices_inline_limit():
+    """
+    :return: longest choice list written in the schema, None writes every list in the schema
+    """
+    return getattr(settings, 'SCHEMA_CHOICES_INLINE_LIMIT', None)
+
+
+def get_field_choices_url(field, widget=False):
+    """
+    :return: url of the static choices of the field, ?base=1 for the base field of an ArrayField, None when the api
+    urls are not installed or the field does not belong to a model
+    """
+    model = getattr(field, 'model', None)
+    if model is None:
+        return None
+    try:
+        # the base field of an ArrayField has the model and the name of the ArrayField
+        is_base_field = model._meta.get_field(field.name) is not field
+        url = reverse('django_schema:field-choices', kwargs={
+            'app_name':model._meta.app_label,
+            'model_name':model.__name__,
+            'field_name':field.name,
+        })
+    except (FieldDoesNotExist, NoReverseMatch):
+        return None
+    params = [name for name, value in [('base=1', is_base_field), ('widget=1', widget)] if value]
+    return f'{url}?{"&".join(params)}' if params else url
+
+
+def get_choices_reference(field, choices, widget=False):
+    """
+    :return: {"url", "count", "etag"} of the choices resource, None when the choices must stay inline
+    """
+    limit = get_choices_inline_limit()
+    if limit is None or len(choices) <= limit:
+        return None
+    url = get_field_choices_url(field, widget)
+    if url is None:
+        return None
+    return {
+        'url':url,
+        'count':len(choices),
+        'etag':get_data_etag(list(choices)),
+    }
+
+
+def get_static_choices_field(app_name, model_name, field_name, widget=False, base=False):
+    """
+    The choices are resolved like the schema does: the model field choices, or the choices of the form widget of the
+    field (BooleanField(null=True) has no model choices but a select widget).
+    :param widget: the choices of the form widget are requested
+    :param base: the base field of an ArrayField is requested
+    :return: model field with choices
+    :raise LookupError: unknown model or field, the field is a relation or does not have the requested choices
+    """
+    model = get_app_model_index().get_model(app_name, model_name)
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        raise LookupError(f"{model_name} has no field {field_name}")
+    if base:
+        field = getattr(field, 'base_field', None)
+        if field is None:
+            raise LookupError(f"{model_name}.{field_name} does not have a base field")
+    # the widget choices of a relation are rows of the related model, served by the model choices endpoint
+    if field.is_relation:
+        raise LookupError(f"{model_name}.{field_name} is a relation")
+    has_choices = hasattr(FieldSnapshot(field).widget, 'choices') if widget else bool(getattr(field, 'choices', None))
+    if not has_choices:
+        raise LookupError(f"{model_name}.{field_name} does not have choices")
+    return field
+
+
+def is_choices_model_allowed(related_model):
+    """
+    Rows of a related model are served by the choices endpoint when the model belongs to the SCHEMA_APPS or its label
+    is listed in SCHEMA_CHOICES_MODELS, ['auth.Group'].
+    :param related_model: model the relation points to
+    """
+    if related_model._meta.label in getattr(settings, 'SCHEMA_CHOICES_MODELS', []):
+        return True
+    return get_app_model_index().is_local_app(related_model._meta.app_label)
+
+
+def get_choices_url(field):
+    """
+    :param field: relation field of a model
+    :return: url of the choices of the field, None when the api urls are not installed or the related model is not
+    allowed
+    """
+    if not is_choices_model_allowed(field.related_model):
+        return None
+    try:
+        return reverse('django_schema:model-choices', kwargs={
+            'app_name':field.model._meta.app_label,
+            'model_name':field.model.__name__,
+            'field_name':field.name,
+        })
+    except NoReverseMatch:
+        return None
+
+
+def get_relation_field(app_name, model_name, field_name):
+    """
+    :return: forward relation field (ForeignKey, OneToOneField, ManyToManyField) of the model
+    :raise LookupError: unknown model or field, the field is not a forward relation or its related model is not allowed
+    """
+    model = get_app_model_index().get_model(app_name, model_name)
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        raise LookupError(f"{model_name} has no field {field_name}")
+    if not field.is_relation or field.auto_created or not hasattr(field, 'get_limit_choices_to'):
+        raise LookupError(f"{model_name}.{field_name} is not a relation with choices")
+    if not is_choices_model_allowed(field.related_model):
+        raise LookupError(f"choices of {field.related_model._meta.label} are not served")
+    return field
+
+
+def get_label_field(related_model):
+    """
+    Column used as label and for the prefix search. SCHEMA_CHOICE_LABEL_FIELDS maps a model label to the field name,
+    {'blog.Category': 'name'}, otherwise the first indexed CharField of the model is used.
+    :return: model field, None when the model has no usable label column
+    """
+    label_fields = getattr(settings, 'SCHEMA_CHOICE_LABEL_FIELDS', {})
+    if related_model._meta.label in label_fields:
+        return related_model._meta.get_field(label_fields[related_model._meta.label])
+    for f in related_model._meta.concrete_fields:
+        if isinstance(f, models.CharField) and (f.unique or f.db_index):
+            return f
+    return None
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    :raise ValueError: malformed cursor
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def get_choices_page(field, search=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    :param field: relation field returned by get_relation_field
+    :param search: prefix of the label
+    :param cursor: ``next`` of the previous page
+    :param limit: page size, at most MAX_PAGE_SIZE
+    :return: {'results': [{'value', 'label'}], 'next': cursor of the next page or None}
+    :raise ValueError: invalid cursor, or search on a model without label column
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    value_field = field.target_field
+    label_field = get_label_field(field.related_model)
+    queryset = field.related_model._default_manager.complex_filter(field.get_limit_choices_to())
+    after = decode_cursor(cursor) if cursor else None
+
+    if label_field is None:
+        if search:
+            raise ValueError(f"{field.related_model._meta.label} has no label field to search, "
+                             f"set it in SCHEMA_CHOICE_LABEL_FIELDS")
+        queryset = queryset.order_by(value_field.name)
+        if after:
+            queryset = queryset.filter(**{f'{value_field.name}__gt':after[0]})
+        # the label is str() of the object, so the whole row is needed
+        rows = [(getattr(obj, value_field.attname), str(obj)) for obj in queryset[:limit + 1]]
+        next_cursor = rows[limit - 1][:1] if len(rows) > limit else None
+    else:
+        value, label = value_field.name, label_field.name
+        if label_field.null:
+            # keyset comparison does not work with NULL
+            queryset = queryset.filter(**{f'{label}__isnull':False})
+        if search:
+            # case sensitive prefix so the label index can be used
+            queryset = queryset.filter(**{f'{label}__startswith':search})
+        if after:
+            if len(after) != 2:
+                raise ValueError("Invalid cursor")
+            queryset = queryset.filter(Q(**{f'{label}__gt':after[1]}) | Q(**{label:after[1], f'{value}__gt':after[0]}))
+        rows = list(queryset.order_by(label, value).values_list(value, label)[:limit + 1])
+        next_cursor = list(rows[limit - 1]) if len(rows) > limit else None
+
+    return {
+        'results':[{'value':v, 'label':l} for v, l in rows[:limit]],
+        'next':encode_cursor(list(next_cursor)) if next_cursor else None,
+    }
@@ -0,0 +1,381 @@
+"""
+Process wide registry of compiled model schemas.
+
+Model definitions can not change while the process is running, so the full schema of a model (every field, every
+style) is built once and each request is answered by projecting the selected fields out of the compiled result.
+The registry is cleared when the app registry is reloaded (``class_prepared``) or after ``migrate`` (``post_migrate``).
+
+The registry is a LRU bounded by the approximate memory footprint of the compiled schemas and of the delta history,
+SCHEMA_REGISTRY_MAX_BYTES (None for no bound). Compiled schemas are read only: strings are interned and lists stored as tuples.
+"""
+import copy
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .defaults import get_schema_etag
+from .delta import schema_history
+from .encoders import encode_json
+from .renderers import STYLE_RENDERERS, get_style_renderer
+from .timing import phase
+
+DEFAULT_STYLE = 'default'
+# Encoded projections kept per compiled schema, the default field selection of every style is the common case
+DEFAULT_ENCODED_CACHE_SIZE = 32
+DEFAULT_REGISTRY_MAX_BYTES = 256 * 1024 * 1024
+
+
+def get_schema_styles():
+    """
+    :return: default style and every registered style
+    """
+    return [DEFAULT_STYLE] + list(STYLE_RENDERERS)
+
+
+def get_schema_fields(model):
+    """
+    Fields of the model which can be rendered as a form field. Reverse relations and generic foreign keys do not
+    provide ``formfield`` and are left out.
+    :param model: Model class
+    :return: list of field objects
+    """
+    return [f for f in model._meta.get_fields() if hasattr(f, 'formfield')]
+
+
+SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+CONTAINER_TYPES = frozenset([dict, list, tuple])
+
+
+def compact(value, memo=None):
+    """
+    Read only copy of json data where equal strings, lists and dicts are shared. The field data of a model repeats
+    many equal values (widget attrs, choices) and the schemas of the styles repeat most of the default schema.
+    :param memo: containers already compacted, shared between the calls of one compiled schema
+    :return: data with interned strings and tuples instead of lists
+    """
+    if memo is None:
+        memo = {}
+    value_type = type(value)
+    if value_type is str:
+        return sys.intern(value)
+    if value_type not in CONTAINER_TYPES:
+        return value
+
+    if value_type is dict:
+        pairs = [(sys.intern(k) if type(k) is str else k, compact(v, memo)) for k, v in value.items()]
+    else:
+        pairs = [(None, compact(v, memo)) for v in value]
+    # compacted containers are shared so equal containers are the same object and compare by id,
+    # the type is part of the key of the scalars as 1 == 1.0 == True
+    key = (value_type is dict, tuple(
+        (k, type(v), v) if type(v) in SCALAR_TYPES else (k, id(v)) for k, v in pairs
+    ))
+    compacted = memo.get(key)
+    if compacted is None:
+        compacted = memo[key] = dict(pairs) if value_type is dict else tuple(v for k, v in pairs)
+    return compacted
+
+
+def get_deep_size(value):
+    """
+    :return: approximate memory footprint in bytes of json data, shared objects are counted once
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return size
+
+
+class CompiledModelSchema(object):
+    """
+    Full schema of one model in the default style and in every registered style.
+    """
+
+    def __init__(self, schema, rendered_schemas, lookup):
+        self.app_name = list(schema.keys())[0]
+        self.full_name = schema[self.app_name]['full_name']
+        self.model_name = list(schema[self.app_name]['models'])[0]
+        memo = {}
+        self.properties = compact(schema[self.app_name]['models'][self.model_name]['properties'], memo)
+        # style name -> schema of every field in that style
+        self.rendered_schemas = compact(rendered_schemas, memo)
+        # field name and attname -> field name
+        self.lookup = lookup
+        # (style, field names) -> (json bytes, etag), least recently used first
+        self._encoded = OrderedDict()
+        self._encoded_lock = threading.Lock()
+        self._size = None
+        self._encoded_size = 0
+        # called with the schema when its size changes, set by the registry holding it
+        self.on_resize = None
+
+    def get_size(self):
+        """
+        :return: approximate memory footprint in bytes, with the encoded projections
+        """
+        if self._size is None:
+            self._size = get_deep_size((self.properties, self.rendered_schemas, self.lookup))
+        return self._size + self._encoded_size
+
+    def get_field_names(self, fields):
+        """
+        :param fields: requested field names or attnames, unknown names are ignored
+        :return: compiled field names in the requested order without duplicates
+        """
+        names = {}
+        for _field in fields:
+            name = self.lookup.get(_field)
+            if name is not None:
+                names[name] = None
+        return list(names)
+
+    def project(self, fields=None, format_style=None):
+        """
+        :param fields: selected fields from the model, all the fields when None
+        :param format_style: Format style of json response
+        :return: schema containing only the selected fields
+        """
+        names = list(self.properties) if fields is None else self.get_field_names(fields)
+        return self.project_names(names, format_style)
+
+    def project_names(self, names, format_style=None):
+        style_renderer = get_style_renderer(format_style)
+        if style_renderer is not None and format_style in self.rendered_schemas:
+            return style_renderer.project(self.rendered_schemas[format_style], names)
+        return self.project_default(names)
+
+    def get_encoded(self, fields=None, format_style=None):
+        """
+        Projection encoded as JSON, each projection is encoded once and served as bytes afterwards.
+        The callable defaults are markers, see defaults.fill_callable_defaults.
+        :param fields: selected fields from the model, all the fields when None
+        :param format_style: Format style of json response
+        :return: (json bytes, etag)
+        """
+        names = tuple(self.properties) if fields is None else tuple(self.get_field_names(fields))
+        if format_style not in self.rendered_schemas:
+            format_style = None
+        key = (format_style, names)
+        with self._encoded_lock:
+            encoded = self._encoded.get(key)
+            if encoded is not None:
+                self._encoded.move_to_end(key)
+                return encoded
+        with phase('encode'):
+            content = encode_json(self.project_names(names, format_style))
+        encoded = (content, get_schema_etag(content))
+        with self._encoded_lock:
+            if key not in self._encoded:
+                self._encoded_size += len(content)
+            self._encoded[key] = encoded
+            while len(self._encoded) > getattr(settings, 'SCHEMA_ENCODED_CACHE_SIZE', DEFAULT_ENCODED_CACHE_SIZE):
+                self._encoded_size -= len(self._encoded.popitem(last=False)[1][0])
+        if self.on_resize is not None:
+            self.on_resize(self)
+        return encoded
+
+    def project_default(self, names):
+        return {
+            self.app_name:{
+                'app_name':self.app_name,
+                'full_name':self.full_name,
+                'models':{
+                    self.model_name:{
+                        'model_name':self.model_name,
+                        'properties':{name:self.properties[name] for name in names}
+                    }
+                }
+            }
+        }
+
+
+def compile_model_schema(app, model, builder):
+    """
+    :param app: App config of the model
+    :param model: Model object
+    :param builder: view providing ``build_default_schema`` and ``get_schema_format_style``
+    :return: CompiledModelSchema
+    """
+    schema_fields = get_schema_fields(model)
+    lookup = {}
+    for f in schema_fields:
+        lookup[f.name] = f.name
+        if getattr(f, 'attname', None):
+            lookup[f.attname] = f.name
+
+    schema = builder.build_default_schema(app, model, [f.name for f in schema_fields])
+    rendered_schemas = {}
+    for style in STYLE_RENDERERS:
+        # renderers update the field values in place
+        rendered_schemas[style] = builder.get_schema_format_style(copy.deepcopy(schema), style)
+    return CompiledModelSchema(schema, rendered_schemas, lookup)
+
+
+class SchemaRegistry(object):
+    """
+    Compiled schemas keyed by builder class and model, least recently used first.
+    """
+
+    def __init__(self):
+        self._schemas = OrderedDict()
+        # key -> size of the schema counted in self._size
+        self._sizes = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._artifact_store = None
+        self._shared_cache = None
+        self._lock = threading.Lock()
+        # Last-Modified of every schema, model definitions only change when the registry is cleared
+        self.last_modified = time.time()
+
+    def get_compiled_schema(self, app, model, builder):
+        key = (builder.__class__, model)
+        with self._lock:
+            compiled = self._schemas.get(key)
+            if compiled is not None:
+                self._schemas.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        compiled = self.load_compiled_schema(model, builder) or self.load_shared_schema(app, model, builder)
+        with self._lock:
+            if key not in self._schemas:
+                self._schemas[key] = compiled
+                compiled.on_resize = functools.partial(self.resize, key)
+                self.account(key, compiled)
+                self.evict()
+            compiled = self._schemas[key]
+        return compiled
+
+    def account(self, key, compiled):
+        """
+        Update the running size of the registry with the current size of the schema. Called with the lock held.
+        """
+        size = compiled.get_size()
+        self._size += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def resize(self, key, compiled):
+        """
+        Called when an encoded projection is added to or dropped from a schema of the registry.
+        """
+        with self._lock:
+            if self._schemas.get(key) is not compiled:
+                return
+            self.account(key, compiled)
+            self.evict()
+
+    def get_max_bytes(self):
+        return getattr(settings, 'SCHEMA_REGISTRY_MAX_BYTES', DEFAULT_REGISTRY_MAX_BYTES)
+
+    def get_size(self):
+        return self._size
+
+    def evict(self):
+        """
+        Drop the least recently used schemas until the registry and the delta history fit in SCHEMA_REGISTRY_MAX_BYTES,
+        the most recent schema is kept even when it is larger. Called with the lock held.
+        """
+        max_bytes = self.get_max_bytes()
+        if max_bytes is None:
+            return
+        history_size = schema_history.get_size()
+        while self._size + history_size > max_bytes and len(self._schemas) > 1:
+            key, compiled = self._schemas.popitem(last=False)
+            self._size -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def get_stats(self):
+        """
+        :return: {'entries', 'size_bytes', 'delta_history_bytes', 'max_bytes', 'hits', 'misses', 'evictions'}
+        """
+        return {
+            'entries':len(self._schemas),
+            'size_bytes':self.get_size(),
+            'delta_history_bytes':schema_history.get_size(),
+            'max_bytes':self.get_max_bytes(),
+            'hits':self.hits,
+            'misses':self.misses,
+            'evictions':self.evictions,
+        }
+
+    def get_artifact_store(self):
+        """
+        :return: ArtifactStore of the SCHEMA_BUILD_DIR setting, None when prebuilt schemas are not used
+        """
+        from .artifacts import ArtifactStore, get_build_dir
+
+        build_dir = get_build_dir()
+        if not build_dir:
+            return None
+        if self._artifact_store is None or self._artifact_store.build_dir != build_dir:
+            self._artifact_store = ArtifactStore(build_dir)
+        return self._artifact_store
+
+    def load_compiled_schema(self, model, builder):
+        """
+        :return: CompiledModelSchema prebuilt by the build_schema command, None when there is no artifact
+        """
+        artifact_store = self.get_artifact_store()
+        if artifact_store is None:
+            return None
+        return artifact_store.load_compiled_schema(model, builder)
+
+    def get_shared_cache(self):
+        """
+        :return: SharedSchemaCache of the SCHEMA_CACHE_ALIAS setting, None when the shared cache is not used
+        """
+        from .shared_cache import SharedSchemaCache, get_schema_cache_alias
+
+        alias = get_schema_cache_alias()
+        if not alias:
+            return None
+        if self._shared_cache is None or self._shared_cache.alias != alias:
+            self._shared_cache = SharedSchemaCache(alias)
+        return self._shared_cache
+
+    def load_shared_schema(self, app, model, builder):
+        """
+        :return: CompiledModelSchema built by any worker, compiled and shared when no worker built it yet
+        """
+        shared_cache = self.get_shared_cache()
+        if shared_cache is None:
+            return compile_model_schema(app, model, builder)
+        keys = shared_cache.get_keys(model, builder)
+        compiled = shared_cache.load_compiled_schema(model, builder, keys)
+        if compiled is None:
+            compiled = compile_model_schema(app, model, builder)
+            shared_cache.store_compiled_schema(model, builder, compiled, keys)
+        return compiled
+
+    def clear(self, **kwargs):
+        """
+        Signal receiver, drops every compiled schema.
+        """
+        with self._lock:
+            self._schemas.clear()
+            self._sizes.clear()
+            self._size = 0
+            self._artifact_store = None
+            self._shared_cache = None
+            self.last_modified = time.time()
+
+
+schema_registry = SchemaRegistry()
@@ -0,0 +1,89 @@
+"""
+Callable defaults of the model fields (``default=timezone.now``).
+
+Their value changes on every call, so the compiled schemas, the artifacts, the shared cache, the ETags and the
+fingerprints hold a marker naming the field instead of the value. The marker is replaced by the value of the default
+when the response is written, and the ETag of a schema with markers is weak.
+"""
+import datetime
+import re
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+
+from .encoders import encode_json
+from .http import get_etag
+
+CALLABLE_DEFAULT_PREFIX = '@@django_schema.callable_default:'
+CALLABLE_DEFAULT_PATTERN = re.compile(rb'"@@django_schema\.callable_default:(\w+\.\w+)\.(\w+)@@"')
+
+
+def get_callable_default_marker(field):
+    """
+    :param field: model field with a callable default
+    :return: marker of the default, '' when the field can not be found again from its model (base field of an
+    ArrayField)
+    """
+    model = getattr(field, 'model', None)
+    if model is None:
+        return ''
+    try:
+        if model._meta.get_field(field.name) is not field:
+            return ''
+    except FieldDoesNotExist:
+        return ''
+    return f'{CALLABLE_DEFAULT_PREFIX}{model._meta.label}.{field.name}@@'
+
+
+def has_callable_defaults(content):
+    """
+    :param content: encoded schema
+    """
+    return CALLABLE_DEFAULT_PREFIX.encode('ascii') in content
+
+
+def get_schema_etag(content):
+    """
+    :param content: encoded schema with the markers
+    :return: quoted ETag, weak when the schema has callable defaults as the response content changes on every call
+    """
+    etag = get_etag(content)
+    return f'W/{etag}' if has_callable_defaults(content) else etag
+
+
+def format_callable_default(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%I:%S %Z")
+    # need to handle other initials
+    return ''
+
+
+def get_callable_default(label, field_name):
+    """
+    :return: formatted value of the default of the field, '' when the field does not exist anymore
+    """
+    try:
+        field = apps.get_model(label)._meta.get_field(field_name)
+    except (LookupError, FieldDoesNotExist):
+        return ''
+    if not callable(field.default):
+        return ''
+    return format_callable_default(field.default())
+
+
+def fill_callable_defaults(content):
+    """
+    :param content: encoded schema with the markers
+    :return: content with the value of each callable default, every default is called once
+    """
+    if not has_callable_defaults(content):
+        return content
+    values = {}
+
+    def replace(match):
+        key = match.groups()
+        if key not in values:
+            values[key] = encode_json(get_callable_default(key[0].decode('ascii'), key[1].decode('ascii')))
+        return values[key]
+
+    return CALLABLE_DEFAULT_PATTERN.sub(replace, content)
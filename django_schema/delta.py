@@ -0,0 +1,196 @@
+"""
+Delta encoding of the schema responses (RFC 3229 with the ``json-patch`` instance manipulation).
+
+A client holding a schema sends its ETag in ``If-None-Match`` together with ``A-IM: json-patch``:
+
+- the schema did not change: empty 304
+- the server still knows the schema of that ETag: 226 IM Used with the JSON Patch (RFC 6902) from that schema
+- otherwise: 200 with the full schema
+
+The schemas served are kept by ETag in a LRU of the process bounded by SCHEMA_DELTA_HISTORY_MAX_BYTES, which counts
+toward SCHEMA_REGISTRY_MAX_BYTES. Model definitions only change across a deploy or a restart, so with SCHEMA_CACHE_ALIAS
+the schemas and the patches are also stored in the shared cache for SCHEMA_DELTA_HISTORY_TIMEOUT seconds and the base
+version of a client is still known by the new processes. Without the shared cache the full schema is sent after a
+restart.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from .encoders import encode_json
+from .http import conditional_response
+
+DEFAULT_HISTORY_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_HISTORY_TIMEOUT = 7 * 24 * 60 * 60
+KEY_PREFIX = 'django_schema:delta'
+JSON_PATCH_CONTENT_TYPE = 'application/json-patch+json'
+# RFC 3229 status of a delta response
+IM_USED = 226
+
+
+def escape_pointer(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def make_json_patch(source, target, path=''):
+    """
+    :param source: json data held by the client
+    :param target: current json data
+    :param path: JSON Pointer of source and target
+    :return: list of JSON Patch operations turning source into target, lists are replaced as a whole
+    """
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({'op':'remove', 'path':f'{path}/{escape_pointer(key)}'})
+        for key, value in target.items():
+            key_path = f'{path}/{escape_pointer(key)}'
+            if key not in source:
+                operations.append({'op':'add', 'path':key_path, 'value':value})
+            else:
+                operations.extend(make_json_patch(source[key], value, key_path))
+        return operations
+    # 1 == 1.0 == True in python, compare the types as well
+    if type(source) is type(target) and source == target:
+        return []
+    return [{'op':'replace', 'path':path, 'value':target}]
+
+
+class SchemaHistory(object):
+    """
+    Encoded schemas served keyed by ETag, and the patches computed between them.
+    """
+
+    def __init__(self):
+        # ('content', etag) or ('patch', base etag, etag) -> bytes, least recently used first
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_max_bytes(self):
+        return getattr(settings, 'SCHEMA_DELTA_HISTORY_MAX_BYTES', DEFAULT_HISTORY_MAX_BYTES)
+
+    def get_size(self):
+        """
+        :return: bytes held by the process
+        """
+        return self._size
+
+    def get_shared_cache(self):
+        """
+        :return: cache of SCHEMA_CACHE_ALIAS, None when the shared cache is not used
+        """
+        alias = getattr(settings, 'SCHEMA_CACHE_ALIAS', None)
+        return caches[alias] if alias else None
+
+    def get_cache_key(self, key):
+        # ETags hold quotes, hashed so the key is valid for every backend
+        return f'{KEY_PREFIX}:{key[0]}:{hashlib.sha1(" ".join(key[1:]).encode("utf-8")).hexdigest()}'
+
+    def put(self, key, value):
+        """
+        :return: False when the entry was already held by the process
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return False
+            self._entries[key] = value
+            self._size += len(value)
+            max_bytes = self.get_max_bytes()
+            while self._size > max_bytes and self._entries:
+                self._size -= len(self._entries.popitem(last=False)[1])
+        return True
+
+    def get(self, key):
+        """
+        :return: bytes of the entry from the process or the shared cache, None when it is unknown
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+        shared_cache = self.get_shared_cache()
+        if shared_cache is None:
+            return None
+        value = shared_cache.get(self.get_cache_key(key))
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def store(self, key, value):
+        # the shared cache is written once per process and entry
+        if self.put(key, value):
+            shared_cache = self.get_shared_cache()
+            if shared_cache is not None:
+                shared_cache.set(self.get_cache_key(key), value,
+                                 timeout=getattr(settings, 'SCHEMA_DELTA_HISTORY_TIMEOUT', DEFAULT_HISTORY_TIMEOUT))
+
+    def add(self, etag, content):
+        self.store(('content', etag), content)
+
+    def get_patch(self, base_etag, etag):
+        """
+        :return: encoded JSON Patch from the schema of base_etag to the schema of etag, None when one of them is unknown
+        """
+        key = ('patch', base_etag, etag)
+        patch = self.get(key)
+        if patch is not None:
+            return patch
+        base, content = self.get(('content', base_etag)), self.get(('content', etag))
+        if base is None or content is None:
+            return None
+        patch = encode_json(make_json_patch(json.loads(base), json.loads(content)))
+        self.store(key, patch)
+        return patch
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+schema_history = SchemaHistory()
+
+
+def accepts_json_patch(request):
+    instance_manipulations = request.META.get('HTTP_A_IM', '')
+    return 'json-patch' in [im.strip().lower() for im in instance_manipulations.split(',')]
+
+
+def delta_response(request, response, last_modified=None, cache_control_setting=None):
+    """
+    conditional_response answering a known base version with the JSON Patch from it.
+    :param request: HttpRequest
+    :param response: full schema response
+    :return: 304, 226 with the JSON Patch or the full response
+    """
+    response = conditional_response(request, response, last_modified, cache_control_setting)
+    patch_vary_headers(response, ['A-IM'])
+    if response.status_code != 200:
+        return response
+    etag = response['ETag']
+    schema_history.add(etag, response.content)
+    if not accepts_json_patch(request):
+        return response
+
+    for base_etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        patch = schema_history.get_patch(base_etag, etag)
+        if patch is None:
+            continue
+        patch_response = HttpResponse(patch, content_type=JSON_PATCH_CONTENT_TYPE, status=IM_USED)
+        patch_response['IM'] = 'json-patch'
+        for header in ['ETag', 'Last-Modified', 'Cache-Control', 'Vary']:
+            if response.has_header(header):
+                patch_response[header] = response[header]
+        return patch_response
+    return response
@@ -0,0 +1,60 @@
+"""
+JSON encoding of the schema responses.
+
+orjson is used when it is installed, otherwise the standard library encoder. SCHEMA_JSON_ENCODER selects the encoder:
+'auto' (default), 'orjson', 'json' or the dotted path of a callable taking the data and returning bytes.
+"""
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def encode_stdlib(data):
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def get_orjson_encoder():
+    """
+    :return: orjson encoder, None when orjson is not installed
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    # datetimes go through DjangoJSONEncoder too, so both encoders write them the same way
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    default = DjangoJSONEncoder().default
+
+    def encode_orjson(data):
+        return orjson.dumps(data, default=default, option=options)
+
+    return encode_orjson
+
+
+@lru_cache(maxsize=None)
+def get_json_encoder(name='auto'):
+    """
+    :param name: value of SCHEMA_JSON_ENCODER
+    :return: callable taking the data and returning bytes
+    """
+    if name == 'json':
+        return encode_stdlib
+    if name in ['auto', 'orjson']:
+        encoder = get_orjson_encoder()
+        if encoder is None and name == 'orjson':
+            raise ImportError("SCHEMA_JSON_ENCODER is 'orjson' but orjson is not installed")
+        return encoder or encode_stdlib
+    return import_string(name)
+
+
+def encode_json(data):
+    """
+    :return: data encoded as JSON bytes
+    """
+    return get_json_encoder(getattr(settings, 'SCHEMA_JSON_ENCODER', 'auto'))(data)
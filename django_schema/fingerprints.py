@@ -0,0 +1,119 @@
+"""
+Merkle tree of the schema: one hash per field computed from the field data of ``_get_field_data``, combined into one
+hash per model, per app and a root hash for the project.
+
+Each node is ``{'hash': ..., 'children': {name: hash}}`` so two environments are compared by walking down the nodes
+whose hash differs only.
+"""
+import hashlib
+import json
+import weakref
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .app_index import get_app_model_index
+from .compiler import schema_registry
+
+# CompiledModelSchema -> (model hash, {field name: hash}), dropped together with the compiled schema
+_model_fingerprints = weakref.WeakKeyDictionary()
+
+
+def get_hash(content):
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def get_field_fingerprint(values):
+    """
+    :param values: field data in the default style
+    :return: hex digest, independent of the order of the keys
+    """
+    return get_hash(json.dumps(values, sort_keys=True, cls=DjangoJSONEncoder))
+
+
+def combine_fingerprints(children):
+    """
+    :param children: {name: hash}, the names are part of the hash so a rename changes it
+    :return: hex digest of the parent node
+    """
+    return get_hash('\n'.join(f'{name}={children[name]}' for name in sorted(children)))
+
+
+def get_node(children):
+    return {
+        'hash':combine_fingerprints(children),
+        'children':children,
+    }
+
+
+def get_model_fingerprints(compiled_schema):
+    """
+    :return: node of the model with the hash of each field, computed once per compiled schema
+    """
+    node = _model_fingerprints.get(compiled_schema)
+    if node is None:
+        children = {name:get_field_fingerprint(values) for name, values in compiled_schema.properties.items()}
+        node = _model_fingerprints[compiled_schema] = get_node(children)
+    return node
+
+
+def get_schema_builder():
+    from .views import ModelsOfLocalApp
+
+    return ModelsOfLocalApp()
+
+
+def get_model_node(app_name, model_name, builder=None):
+    """
+    :raise LookupError: unknown app or model
+    """
+    index = get_app_model_index()
+    app_config = index.get_app_config(app_name)
+    model = index.get_model(app_name, model_name)
+    compiled_schema = schema_registry.get_compiled_schema(app_config, model, builder or get_schema_builder())
+    return get_model_fingerprints(compiled_schema)
+
+
+def get_app_node(app_name, builder=None):
+    """
+    :raise LookupError: unknown app
+    """
+    builder = builder or get_schema_builder()
+    app_config = get_app_model_index().get_app_config(app_name)
+    return get_node({
+        model.__name__:get_model_node(app_name, model.__name__, builder)['hash'] for model in app_config.get_models()
+    })
+
+
+def get_root_node(app_names):
+    """
+    :param app_names: apps of the project, get_local_apps()
+    """
+    builder = get_schema_builder()
+    return get_node({app_name:get_app_node(app_name, builder)['hash'] for app_name in app_names})
+
+
+def compare_nodes(get_source_node, get_target_node, path=(), depth=3):
+    """
+    Walk down the nodes whose hash differ, the unchanged subtrees are not fetched.
+    :param get_source_node: callable(path) returning the node at path, path is () for the root, (app,) or (app, model)
+    :param get_target_node: same for the other environment
+    :param path: path of the nodes to compare
+    :param depth: levels below path, 3 for the root (app, model, field)
+    :return: list of (path, 'added' | 'removed' | 'changed'), added in the target
+    """
+    source, target = get_source_node(path), get_target_node(path)
+    if source['hash'] == target['hash']:
+        return []
+    differences = []
+    for name in sorted(set(source['children']) | set(target['children'])):
+        child_path = path + (name,)
+        if name not in target['children']:
+            differences.append((child_path, 'removed'))
+        elif name not in source['children']:
+            differences.append((child_path, 'added'))
+        elif source['children'][name] != target['children'][name]:
+            if depth > 1:
+                differences.extend(compare_nodes(get_source_node, get_target_node, child_path, depth - 1))
+            else:
+                differences.append((child_path, 'changed'))
+    return differences
@@ -0,0 +1,38 @@
+"""
+Generated ModelForm classes shared by all the views.
+"""
+from functools import lru_cache
+
+from django.forms import ModelForm, modelform_factory
+
+from .timing import phase
+
+MODEL_FORM_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=MODEL_FORM_CACHE_SIZE)
+def get_model_form_class(meta_model):
+    """
+    :param meta_model: Model object
+    :return: ModelForm class with all the fields of the model
+    """
+    return modelform_factory(meta_model, form=ModelForm, fields="__all__")
+
+
+@lru_cache(maxsize=MODEL_FORM_CACHE_SIZE)
+def get_model_form_fields(meta_model):
+    """
+    :param meta_model: Model object
+    :return: names of the fields of the default ModelForm of the model
+    """
+    with phase('form'):
+        form = get_model_form_class(meta_model)()
+        return frozenset(form.fields)
+
+
+def clear_model_form_cache(**kwargs):
+    """
+    Signal receiver, drops the generated ModelForm classes.
+    """
+    get_model_form_class.cache_clear()
+    get_model_form_fields.cache_clear()
@@ -0,0 +1,72 @@
+"""
+Validators (ETag, Last-Modified) and Cache-Control for the schema responses.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+# Clients may keep the response but must revalidate it, which is answered with an empty 304
+DEFAULT_CACHE_CONTROL = {'no_cache':True}
+
+
+def get_etag(content):
+    """
+    :param content: response body as bytes
+    :return: quoted ETag derived from the content
+    """
+    return quote_etag(hashlib.sha1(content).hexdigest())
+
+
+def get_data_etag(data):
+    """
+    :param data: json serializable data, keys are sorted so the ETag does not depend on the order
+    :return: quoted ETag derived from the data
+    """
+    return get_etag(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode('utf-8'))
+
+
+def get_cache_control(setting_name):
+    return getattr(settings, setting_name, DEFAULT_CACHE_CONTROL)
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    If-None-Match takes precedence over If-Modified-Since as in RFC 7232.
+    The schema POST only reads data, so it is validated like a GET.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return if_none_match.strip() == '*' or etag in parse_etags(if_none_match)
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+    return bool(if_modified_since and last_modified and int(last_modified) <= if_modified_since)
+
+
+def set_validators(response, etag, last_modified=None, cache_control=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
+
+
+def conditional_response(request, response, last_modified=None, cache_control_setting=None, etag=None):
+    """
+    :param request: HttpRequest
+    :param response: full response, its ETag header or its content is used when etag is not given
+    :param last_modified: timestamp of the last change of the data
+    :param cache_control_setting: name of the setting with the Cache-Control directives
+    :param etag: ETag of the response
+    :return: response or an empty 304 response with the same validators
+    """
+    if etag is None:
+        etag = response['ETag'] if response.has_header('ETag') else get_etag(response.content)
+    if is_not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+    cache_control = get_cache_control(cache_control_setting) if cache_control_setting else None
+    return set_validators(response, etag, last_modified, cache_control)
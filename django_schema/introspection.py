@@ -0,0 +1,142 @@
+"""
+Introspection helpers for model fields.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from .forms import get_model_form_fields
+
+FieldListing = namedtuple('FieldListing', ['name', 'attname', 'internal_type', 'null', 'auto_created',
+                                           'is_in_default_model_form_fields'])
+
+
+@lru_cache(maxsize=256)
+def get_app_field_listing(_models):
+    """
+    Fields of the models listed on the local app page, computed once and shared between threads.
+    Field objects are process global so nothing is set on them.
+    :param _models: tuple of the models of the app
+    :return: read only {model name: tuple of FieldListing}
+    """
+    listing = {}
+    for _model in _models:
+        model_form_fields = get_model_form_fields(_model)
+        listing[_model.__name__] = tuple(
+            FieldListing(
+                name=f.name,
+                # reverse relations do not have attname
+                attname=getattr(f, 'attname', ''),
+                internal_type=f.get_internal_type(),
+                null=f.null,
+                auto_created=f.auto_created,
+                is_in_default_model_form_fields=f.name in model_form_fields,
+            )
+            for f in _model._meta.get_fields()
+        )
+    return MappingProxyType(listing)
+
+
+@lru_cache(maxsize=None)
+def get_array_field_classes():
+    """
+    django.contrib.postgres needs psycopg2, it is imported the first time a field with a base field is introspected.
+    :return: (ArrayField, SimpleArrayField) or None when PostgreSQL support is not installed
+    """
+    try:
+        from django.contrib.postgres.fields import ArrayField
+        from django.contrib.postgres.forms import SimpleArrayField
+    except ImportError:
+        return None
+    return ArrayField, SimpleArrayField
+
+
+def is_simple_array_field(snapshot):
+    """
+    :param snapshot: FieldSnapshot
+    :return: True for an ArrayField rendered as SimpleArrayField
+    """
+    if not hasattr(snapshot.field, 'base_field'):
+        return False
+    array_field_classes = get_array_field_classes()
+    if array_field_classes is None:
+        return False
+    array_field, simple_array_field = array_field_classes
+    return isinstance(snapshot.field, array_field) and isinstance(snapshot.form_field, simple_array_field)
+
+
+class FieldSnapshot(object):
+    """
+    Model field together with its form field and widget.
+    ``formfield()`` builds a new form field and widget on every call, the snapshot calls it once and every helper
+    reads from the same instances.
+    """
+    __slots__ = ('field', 'form_field', 'widget')
+
+    def __init__(self, field):
+        self.field = field
+        # AutoField does not have form field
+        self.form_field = field.formfield()
+        self.widget = getattr(self.form_field, 'widget', '')
+
+    @property
+    def form_field_type(self):
+        return self.form_field.__class__.__name__
+
+    @property
+    def widget_class(self):
+        return self.widget.__class__.__name__
+
+
+class WidgetDescriptor(object):
+    """
+    Widget data of ``html_form_element`` collected by ``get_html_element_data``.
+    """
+    __slots__ = ('attrs', 'widget_class', 'type', 'allow_multiple_selected', 'format', 'choices',
+                 'can_be_autocomplete', 'set_id_on_form_save', 'form_field_type_for_reference', 'choices_url')
+
+    def __init__(self, values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+
+class HtmlFormElementDescriptor(object):
+    __slots__ = ('element_type', 'form_field_type', 'widget')
+
+    def __init__(self, values):
+        self.element_type = values.get('element_type')
+        self.form_field_type = values.get('form_field_type')
+        self.widget = WidgetDescriptor(values.get('widget') or {})
+
+
+class FieldDescriptor(object):
+    """
+    Field values used by the style renderers, see ``ModelsOfLocalApp.get_field_values``.
+    """
+    __slots__ = ('key', 'label', 'is_required', 'placeholder', 'default', 'max_length', 'min_length', 'id', 'name',
+                 'help_text', 'choices', 'form_field_type', 'html_form_element', 'base_field')
+
+    def __init__(self, key, label, is_required, placeholder, default, max_length, min_length, values):
+        self.key = key
+        self.label = label
+        self.is_required = is_required
+        self.placeholder = placeholder
+        self.default = default
+        self.max_length = max_length
+        self.min_length = min_length
+        self.id = key
+        self.name = key
+        self.help_text = values.get('help_text')
+        self.choices = values.get('choices')
+        self.form_field_type = values.get('form_field_type')
+        # AutoField does not have html_form_element
+        self.html_form_element = HtmlFormElementDescriptor(values.get('html_form_element') or {})
+        # field data of the base field of an ArrayField, keyed by the field name
+        self.base_field = values.get('base_field')
+
+
+def clear_field_listing_cache(**kwargs):
+    """
+    Signal receiver, drops the field listings of the local app page.
+    """
+    get_app_field_listing.cache_clear()
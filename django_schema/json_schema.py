@@ -0,0 +1,271 @@
+"""
+JSON Schema (draft 2020-12) style, served on the ``json-schema`` value of the ``<style>`` url segment.
+
+Definitions shared by several fields are written once under ``$defs`` and referenced with ``$ref``:
+
+- related models, by label, with the type of their primary key
+- choices used by several fields, by the first field using them
+- field shapes with more than one keyword used by several fields, by their keywords (``string.maxLength_100``)
+
+Choices and shapes used by one field stay inline.
+
+Field renderers registered on the style return ``{field_name: json schema}``, a ``$defs`` in the returned schema is
+moved to the ``$defs`` of the model.
+"""
+import json
+from collections import Counter
+
+from .app_index import get_app_model_index
+from .renderers import StyleRenderer, register_style
+
+JSON_SCHEMA_DIALECT = 'https://json-schema.org/draft/2020-12/schema'
+DEFS_POINTER = '#/$defs/'
+
+INTEGER_TYPES = {'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField',
+                 'SmallIntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField', 'PositiveBigIntegerField'}
+POSITIVE_INTEGER_TYPES = {'PositiveIntegerField', 'PositiveSmallIntegerField', 'PositiveBigIntegerField'}
+NUMBER_TYPES = {'FloatField', 'DecimalField'}
+BOOLEAN_TYPES = {'BooleanField', 'NullBooleanField'}
+RELATION_TYPES = {'ForeignKey', 'OneToOneField'}
+# form field type -> string format
+STRING_FORMATS = {
+    'EmailField':'email',
+    'URLField':'uri',
+    'UUIDField':'uuid',
+    'DateField':'date',
+    'DateTimeField':'date-time',
+    'TimeField':'time',
+    'DurationField':'duration',
+}
+# keywords of the field shapes shared through $defs, in the order of the definition names
+SHAPE_KEYWORDS = ('type', 'format', 'minimum', 'minLength', 'maxLength')
+
+
+def get_ref(name):
+    return {'$ref':DEFS_POINTER + name.replace('~', '~0').replace('/', '~1')}
+
+
+def get_ref_name(ref):
+    return ref[len(DEFS_POINTER):].replace('~1', '/').replace('~0', '~')
+
+
+def get_type_schema(internal_type, form_field_type=None, max_length=None, min_length=None):
+    """
+    :return: JSON Schema of the value of a model field
+    """
+    if internal_type in INTEGER_TYPES:
+        schema = {'type':'integer'}
+        if internal_type in POSITIVE_INTEGER_TYPES:
+            schema['minimum'] = 0
+        return schema
+    if internal_type in NUMBER_TYPES:
+        return {'type':'number'}
+    if internal_type in BOOLEAN_TYPES:
+        return {'type':'boolean'}
+    if internal_type == 'JSONField':
+        return {}
+    schema = {'type':'string'}
+    if form_field_type in STRING_FORMATS:
+        schema['format'] = STRING_FORMATS[form_field_type]
+    if isinstance(min_length, int):
+        schema['minLength'] = min_length
+    if isinstance(max_length, int):
+        schema['maxLength'] = max_length
+    return schema
+
+
+def get_related_model_schema(label):
+    """
+    :param label: label of the related model
+    :return: JSON Schema of the primary key of the model
+    """
+    try:
+        pk = get_app_model_index().get_model_by_label(label)._meta.pk
+    except LookupError:
+        return {'title':label}
+    # multi table inheritance, the primary key is a relation to the parent
+    while pk.is_relation:
+        pk = pk.target_field
+    schema = get_type_schema(pk.get_internal_type(), max_length=pk.max_length)
+    schema.update({
+        'title':label,
+        'description':f"Primary key of {label}",
+    })
+    return schema
+
+
+def get_choices_schema(choices):
+    """
+    :param choices: formatted choices, or the reference to the choices resource of a long list
+    """
+    if isinstance(choices, dict):
+        return {'$comment':f"choices: {choices['url']}"}
+    return {'oneOf':[{'const':choice['value'], 'title':choice['label']} for choice in choices]}
+
+
+def get_field_schema(values):
+    """
+    :param values: field data in the default style
+    :return: JSON Schema of the field with the related models under $defs
+    """
+    internal_type = values['data_type']
+    if internal_type in RELATION_TYPES or internal_type == 'ManyToManyField':
+        label = values['related_model']
+        schema = get_ref(label)
+        if internal_type == 'ManyToManyField':
+            schema = {'type':'array', 'items':schema, 'uniqueItems':True}
+        schema['$defs'] = {label:get_related_model_schema(label)}
+    elif values['choices']:
+        schema = get_choices_schema(values['choices'])
+    elif values.get('base_field'):
+        base_values = list(values['base_field'].values())[0]
+        items = get_field_schema(base_values)
+        schema = {'type':'array', 'items':items}
+    else:
+        schema = get_type_schema(internal_type, values['form_field_type'], values['max_length'],
+                                 values['min_length'])
+    return schema
+
+
+def render_json_schema_field(view, field_name, values):
+    schema = get_field_schema(values)
+    if values['label']:
+        schema['title'] = values['label']
+    if values['help_text']:
+        schema['description'] = values['help_text']
+    if not values['html_form_element']:
+        # fields without form field (AutoField) are set by the database
+        schema['readOnly'] = True
+    elif values['default'] is not None:
+        schema['default'] = values['default']
+    return {field_name:schema}
+
+
+def get_definition_key(definition):
+    return json.dumps(definition, sort_keys=True, default=str)
+
+
+def get_choices_definition(field_schema):
+    """
+    :return: choices of the field schema as a definition, None when the field does not have inline choices
+    """
+    if 'oneOf' not in field_schema:
+        return None
+    return {'oneOf':field_schema['oneOf']}
+
+
+def get_shape(field_schema):
+    """
+    :return: shape keywords of the field schema, None when there are less than two
+    """
+    shape = {keyword:field_schema[keyword] for keyword in SHAPE_KEYWORDS if keyword in field_schema}
+    return shape if len(shape) > 1 else None
+
+
+def collect_refs(value, refs):
+    """
+    Add the names of the definitions referenced in value to refs.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == '$ref' and isinstance(item, str) and item.startswith(DEFS_POINTER):
+                refs.add(get_ref_name(item))
+            else:
+                collect_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            collect_refs(item, refs)
+    return refs
+
+
+class JsonSchemaRenderer(StyleRenderer):
+    name = 'json-schema'
+    default_renderer = staticmethod(render_json_schema_field)
+
+    def render(self, view, schema):
+        app_name = list(schema.keys())[0]
+        model_name = list(schema[app_name]['models'])[0]
+        form_fields = schema[app_name]['models'][model_name]['properties']
+        defs = {}
+        # json of a shared definition -> name in $defs
+        def_names = {}
+        field_schemas = {}
+        for field, values in form_fields.items():
+            field_schema = self.render_field(view, field, values)[field]
+            for name, definition in field_schema.pop('$defs', {}).items():
+                defs.setdefault(name, definition)
+            field_schemas[field] = field_schema
+        # json of the choices and shapes -> number of fields using them
+        counts = Counter(
+            get_definition_key(definition)
+            for field_schema in field_schemas.values()
+            for definition in [get_choices_definition(field_schema), get_shape(field_schema)]
+            if definition is not None
+        )
+        properties = {
+            field:self.share_definitions(field, field_schema, defs, def_names, counts)
+            for field, field_schema in field_schemas.items()
+        }
+
+        json_schema = {
+            '$schema':JSON_SCHEMA_DIALECT,
+            'title':model_name,
+            'type':'object',
+            'properties':properties,
+            'required':[field for field, values in form_fields.items() if values['required']],
+            '$defs':defs,
+        }
+        return json_schema
+
+    def share_definitions(self, field, field_schema, defs, def_names, counts):
+        """
+        Move the choices and the field shape of the field schema to defs when several fields use them.
+        :param counts: {definition key: number of fields using the definition}
+        :return: field schema referencing defs
+        """
+        choices = get_choices_definition(field_schema)
+        if choices is not None and counts[get_definition_key(choices)] > 1:
+            del field_schema['oneOf']
+            field_schema.update(get_ref(self.add_definition(choices, f'{field}.choices', defs, def_names)))
+        shape = get_shape(field_schema)
+        if shape is not None and counts[get_definition_key(shape)] > 1:
+            # third party renderers may return a shape without type
+            name = '.'.join(str(shape[keyword]) if keyword == 'type' else f'{keyword}_{shape[keyword]}'
+                            for keyword in SHAPE_KEYWORDS if keyword in shape)
+            name = self.add_definition(shape, name, defs, def_names)
+            field_schema = dict(get_ref(name), **{k:v for k, v in field_schema.items() if k not in shape})
+        return field_schema
+
+    def add_definition(self, definition, name, defs, def_names):
+        """
+        :return: name of the definition in defs, the name of an equal definition when there is one
+        """
+        key = get_definition_key(definition)
+        if key not in def_names:
+            while name in defs:
+                name = f'{name}_'
+            defs[name] = definition
+            def_names[key] = name
+        return def_names[key]
+
+    def project(self, rendered_schema, names):
+        selected = set(names)
+        properties = {name:rendered_schema['properties'][name] for name in names}
+        defs = rendered_schema['$defs']
+        # definitions of the selected fields and the definitions they reference
+        refs = collect_refs(properties, set())
+        pending = list(refs)
+        while pending:
+            for name in collect_refs(defs.get(pending.pop(), {}), set()) - refs:
+                refs.add(name)
+                pending.append(name)
+        json_schema = dict(rendered_schema)
+        json_schema.update({
+            'properties':properties,
+            'required':[name for name in rendered_schema['required'] if name in selected],
+            '$defs':{name:definition for name, definition in defs.items() if name in refs},
+        })
+        return json_schema
+
+
+json_schema_style = register_style(JsonSchemaRenderer())
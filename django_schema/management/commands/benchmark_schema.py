@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmark import Benchmark, compare_results
+
+
+def int_list(value):
+    return [int(x) for x in value.split(',')]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the schema views on synthetic models of every given size. " \
+           "Prints the latency and allocation peak per call and optionally fails on regressions against a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', type=int_list, default=[10], help="Comma separated model counts, e.g. 10,100")
+        parser.add_argument('--fields', type=int_list, default=[20],
+                            help="Comma separated field counts per model, e.g. 10,50,200")
+        parser.add_argument('--repeat', type=int, default=20, help="Calls measured per case")
+        parser.add_argument('--case', action='append', dest='cases', help="Only run this case, can be repeated")
+        parser.add_argument('--save-baseline', help="Write the results to this json file")
+        parser.add_argument('--baseline', help="Compare the results with this json file")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed slowdown of the median latency against the baseline, default 0.25")
+
+    def handle(self, *args, **options):
+        results = {}
+        self.stdout.write(f"{'case':<28}{'size':>10}{'min ms':>10}{'median ms':>12}{'p95 ms':>10}{'peak KiB':>12}")
+        for model_count in options['models']:
+            for field_count in options['fields']:
+                size = f'{model_count}x{field_count}'
+                benchmark = Benchmark(model_count, field_count, repeat=options['repeat'])
+                for case, measurements in benchmark.run(options['cases']).items():
+                    results[f'{case}@{size}'] = measurements
+                    self.stdout.write(
+                        f"{case:<28}{size:>10}{measurements['min_ms']:>10.2f}{measurements['median_ms']:>12.2f}"
+                        f"{measurements['p95_ms']:>10.2f}{measurements['peak_kib']:>12.1f}"
+                    )
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = compare_results(baseline, results, options['tolerance'])
+            for key, base_median, median in regressions:
+                self.stderr.write(f"{key}: median {median:.2f} ms, baseline {base_median:.2f} ms")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...app_index import get_app_model_index
+from ...artifacts import ArtifactStore, get_build_dir, get_model_definition_hash
+from ...compiler import compile_model_schema
+from ...views import ModelsOfLocalApp, get_apps_and_models
+
+
+class Command(BaseCommand):
+    help = "Build the schema of every model of the SCHEMA_APPS in every style into SCHEMA_BUILD_DIR. " \
+           "Only the models whose definition changed since the last build are rebuilt."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=None, help="Build directory, defaults to SCHEMA_BUILD_DIR")
+        parser.add_argument('--force', action='store_true', help="Rebuild every model")
+
+    def handle(self, *args, **options):
+        build_dir = options['output_dir'] or get_build_dir()
+        if not build_dir:
+            raise CommandError("Set SCHEMA_BUILD_DIR in the settings or pass --output-dir")
+
+        builder = ModelsOfLocalApp()
+        store = ArtifactStore(build_dir)
+        force = options['force'] or not store.is_compatible(builder)
+        built = unchanged = 0
+        model_labels = set()
+        index = get_app_model_index()
+        apps_and_models = get_apps_and_models()
+
+        for app_name, models in apps_and_models.items():
+            # short name of the SCHEMA_APPS, 'shop' for the app apps.v1.shop labelled v1_shop
+            app_config = index.get_app_config(app_name)
+            app_changed = False
+            for model in models:
+                model_labels.add(model._meta.label)
+                definition_hash = get_model_definition_hash(model)
+                if not force and store.is_model_current(model, definition_hash):
+                    unchanged += 1
+                    continue
+                compiled_schema = compile_model_schema(app_config, model, builder)
+                store.write_model(app_name, model, compiled_schema, definition_hash)
+                built += 1
+                app_changed = True
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"Built {model._meta.label}")
+            if app_changed or not store.is_app_current(app_name, models):
+                store.write_app(app_name, models)
+
+        for label in set(store.manifest['models']) - model_labels:
+            store.remove_model(label)
+        for app_name in set(store.manifest['apps']) - set(apps_and_models):
+            store.remove_app(app_name)
+        store.write_manifest(builder)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {built} models, {unchanged} unchanged, schema written to {build_dir}"
+        ))
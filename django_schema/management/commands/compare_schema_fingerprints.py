@@ -0,0 +1,71 @@
+import json
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...fingerprints import compare_nodes, get_app_node, get_model_node, get_root_node
+from ...views import get_local_apps
+
+LOCAL = 'local'
+
+
+def get_local_node(path):
+    if not path:
+        return get_root_node(get_local_apps())
+    if len(path) == 1:
+        return get_app_node(path[0])
+    return get_model_node(*path)
+
+
+class RemoteFingerprints(object):
+    """
+    Nodes served by the fingerprints api of another environment.
+    """
+
+    def __init__(self, base_url, headers=None, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers or {}
+        self.timeout = timeout
+
+    def __call__(self, path):
+        url = '/'.join([self.base_url] + [quote(name) for name in path])
+        request = Request(url, headers=dict(self.headers, Accept='application/json'))
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except (URLError, ValueError) as e:
+            raise CommandError(f"Can not read fingerprints from {url}: {e}")
+
+
+class Command(BaseCommand):
+    help = "Compare the schema fingerprints of two environments, only the apps and models whose hash differ are " \
+           "fetched. An environment is 'local' or the url of the fingerprints api, " \
+           "https://staging.example.com/schema/api/fingerprints"
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="'local' or url of the fingerprints api")
+        parser.add_argument('target', help="'local' or url of the fingerprints api")
+        parser.add_argument('--header', action='append', default=[],
+                            help="Request header of the remote environments, 'Authorization: Token ...'")
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def get_source(self, name, options):
+        if name == LOCAL:
+            return get_local_node
+        headers = {}
+        for header in options['header']:
+            key, _, value = header.partition(':')
+            headers[key.strip()] = value.strip()
+        return RemoteFingerprints(name, headers, options['timeout'])
+
+    def handle(self, *args, **options):
+        source = self.get_source(options['source'], options)
+        target = self.get_source(options['target'], options)
+        differences = compare_nodes(source, target)
+        for path, change in differences:
+            self.stdout.write(f"{change:<8} {'.'.join(path)}")
+        if differences:
+            raise CommandError(f"{len(differences)} differences between {options['source']} and {options['target']}")
+        self.stdout.write(self.style.SUCCESS("Schemas are identical"))
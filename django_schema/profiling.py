@@ -0,0 +1,190 @@
+"""
+Profiling of the schema requests for staff users, enabled with SCHEMA_PROFILING = True.
+
+``?profile=1`` on a profiled view runs the request under cProfile and tracemalloc and returns the report together with
+the response data, ``?profile=store`` returns the normal response and stores the report, its url is written in the
+X-Schema-Profile header. Stored reports are kept SCHEMA_PROFILE_TIMEOUT seconds in the SCHEMA_PROFILE_CACHE_ALIAS
+cache and are downloaded as json or as a pstats file.
+
+tracemalloc traces every thread of the process, allocations of concurrent requests show up in the memory report. One
+request is profiled at a time, a second profile request while one is running is answered with 503.
+"""
+import cProfile
+import functools
+import json
+import marshal
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.urls import NoReverseMatch, reverse
+
+from .encoders import JSON_CONTENT_TYPE, encode_json
+
+DEFAULT_LIMIT = 30
+DEFAULT_TIMEOUT = 60 * 60
+KEY_PREFIX = 'django_schema:profile'
+# seconds a client waits before profiling again
+BUSY_RETRY_AFTER = 1
+
+# held while a call is profiled, tracemalloc and the profiler are process wide
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """
+    Raised by profile_call when another call is profiled.
+    """
+
+
+def is_profiling_allowed(request):
+    """
+    :return: True when SCHEMA_PROFILING is set and the user is an active staff member
+    """
+    user = getattr(request, 'user', None)
+    return bool(getattr(settings, 'SCHEMA_PROFILING', False) and user is not None and user.is_active and
+                user.is_staff)
+
+
+def get_profile_cache():
+    return caches[getattr(settings, 'SCHEMA_PROFILE_CACHE_ALIAS', 'default')]
+
+
+def get_cpu_report(stats, limit):
+    """
+    :param stats: pstats.Stats
+    :return: the limit functions with the longest cumulative time
+    """
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, total, cumulative, callers) in stats.stats.items():
+        rows.append({
+            'function':f'{filename}:{line}({function})',
+            'calls':calls,
+            'total_ms':total * 1000,
+            'cumulative_ms':cumulative * 1000,
+        })
+    rows.sort(key=lambda row:row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+
+def get_memory_report(snapshot, peak, limit):
+    """
+    :return: allocation peak and the limit allocation sites holding the most memory at the end of the call
+    """
+    top = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        top.append({
+            'site':f'{frame.filename}:{frame.lineno}',
+            'size_kib':stat.size / 1024,
+            'count':stat.count,
+        })
+    return {
+        'peak_kib':peak / 1024,
+        'top':top,
+    }
+
+
+def profile_call(func, *args, limit=DEFAULT_LIMIT, **kwargs):
+    """
+    :return: (result of func, report, marshalled pstats data)
+    :raise ProfilerBusy: another call is profiled
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("Another request is profiled")
+    try:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            result = profiler.runcall(func, *args, **kwargs)
+            duration = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+    finally:
+        _profile_lock.release()
+    # Stats takes the data out of the profiler
+    stats = pstats.Stats(profiler)
+    report = {
+        'duration_ms':duration * 1000,
+        'cpu':get_cpu_report(stats, limit),
+        'memory':get_memory_report(snapshot, peak, limit),
+    }
+    return result, report, marshal.dumps(stats.stats)
+
+
+def store_profile(report, stats):
+    """
+    :return: id of the stored profile
+    """
+    profile_id = uuid.uuid4().hex
+    timeout = getattr(settings, 'SCHEMA_PROFILE_TIMEOUT', DEFAULT_TIMEOUT)
+    get_profile_cache().set(f'{KEY_PREFIX}:{profile_id}', {'report':report, 'stats':stats}, timeout=timeout)
+    return profile_id
+
+
+def load_profile(profile_id):
+    """
+    :return: {'report', 'stats'}, None when the profile expired
+    """
+    return get_profile_cache().get(f'{KEY_PREFIX}:{profile_id}')
+
+
+def get_profile_url(profile_id):
+    try:
+        return reverse('django_schema:profile-detail', kwargs={'profile_id':profile_id})
+    except NoReverseMatch:
+        return profile_id
+
+
+def get_busy_response():
+    response = HttpResponse(encode_json({'detail':"Another request is profiled"}), content_type=JSON_CONTENT_TYPE,
+                            status=503)
+    response['Retry-After'] = str(BUSY_RETRY_AFTER)
+    return response
+
+
+def get_response_data(response):
+    """
+    :return: data of a DRF Response or json content of a response, None for an empty response
+    """
+    if hasattr(response, 'data'):
+        return response.data
+    return json.loads(response.content) if response.content else None
+
+
+def profiled(view_method):
+    """
+    Decorator of a view method running the request under the profilers when ``?profile`` is set by a staff user.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        mode = request.GET.get('profile')
+        if not mode or not is_profiling_allowed(request):
+            return view_method(self, request, *args, **kwargs)
+        try:
+            response, report, stats = profile_call(view_method, self, request, *args, **kwargs)
+        except ProfilerBusy:
+            return get_busy_response()
+        if mode == 'store':
+            response['X-Schema-Profile'] = get_profile_url(store_profile(report, stats))
+            return response
+        return HttpResponse(encode_json({
+            'status_code':response.status_code,
+            'profile':report,
+            'response':get_response_data(response),
+        }), content_type=JSON_CONTENT_TYPE)
+
+    return wrapper
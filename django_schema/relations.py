@@ -0,0 +1,130 @@
+"""
+Relation graph of the project and nested schemas of the related models.
+
+The graph is built once from ``_meta.get_fields()`` of every installed model: forward relations (ForeignKey,
+OneToOneField, ManyToManyField) and the reverse relations created for them. A schema request with a relation depth
+embeds the schema of every model reachable within that depth once, keyed by model label::
+
+    {"schema": <schema of the model>, "related": {"blog.Category": <schema>, ...}}
+"""
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from django.apps import apps
+from django.conf import settings
+
+from .compiler import schema_registry
+from .encoders import encode_json
+
+DEFAULT_MAX_RELATION_DEPTH = 3
+
+RelationEdge = namedtuple('RelationEdge', ['field_name', 'kind', 'target', 'reverse'])
+
+
+def get_relation_kind(field):
+    if field.many_to_many:
+        return 'many_to_many'
+    if field.one_to_one:
+        return 'one_to_one'
+    if field.many_to_one:
+        return 'foreign_key'
+    return 'one_to_many'
+
+
+@lru_cache(maxsize=None)
+def get_relation_graph():
+    """
+    :return: read only {model: tuple of RelationEdge}
+    """
+    graph = {}
+    for model in apps.get_models():
+        edges = []
+        for f in model._meta.get_fields():
+            # GenericForeignKey has no related model
+            if not f.is_relation or f.related_model is None:
+                continue
+            edges.append(RelationEdge(
+                field_name=f.name,
+                kind=get_relation_kind(f),
+                target=f.related_model,
+                reverse=f.auto_created and not f.concrete,
+            ))
+        graph[model] = tuple(edges)
+    return MappingProxyType(graph)
+
+
+def get_max_relation_depth():
+    return getattr(settings, 'SCHEMA_MAX_RELATION_DEPTH', DEFAULT_MAX_RELATION_DEPTH)
+
+
+def get_relation_depth(value):
+    """
+    :param value: requested depth, query or form value
+    :return: depth between 0 and SCHEMA_MAX_RELATION_DEPTH
+    :raise ValueError: not a number
+    """
+    if not value:
+        return 0
+    return max(0, min(int(value), get_max_relation_depth()))
+
+
+@lru_cache(maxsize=1024)
+def get_related_models(model, depth, reverse=False, field_names=None):
+    """
+    Models reachable from model within depth relations, each model once. Results are memoised so the models shared by
+    several requests are walked once.
+    :param field_names: forward relations of model to follow, frozenset of field names, all when None
+    :param reverse: follow the reverse relations too
+    :return: tuple of models in breadth first order, without model
+    """
+    graph = get_relation_graph()
+    seen = {model}
+    related = []
+    level = [model]
+    for current_depth in range(depth):
+        next_level = []
+        for source in level:
+            for edge in graph.get(source, ()):
+                if edge.reverse and not reverse:
+                    continue
+                # reverse relations are not form fields, they can not be selected
+                if source is model and field_names is not None and not edge.reverse and \
+                        edge.field_name not in field_names:
+                    continue
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    related.append(edge.target)
+                    next_level.append(edge.target)
+        level = next_level
+    return tuple(related)
+
+
+def encode_related_schemas(related_models, builder, format_style=None):
+    """
+    :return: json object of the schema of every related model keyed by label, the schemas are the encoded projections
+    of the compiled schema registry
+    """
+    parts = []
+    for related_model in related_models:
+        compiled_schema = schema_registry.get_compiled_schema(related_model._meta.app_config, related_model, builder)
+        parts.append(encode_json(related_model._meta.label) + b':' + compiled_schema.get_encoded(
+            format_style=format_style)[0])
+    return b'{' + b','.join(parts) + b'}'
+
+
+def encode_nested_schema(content, related_models, builder, format_style=None):
+    """
+    :param content: encoded schema of the requested model
+    :return: {"schema", "related"} encoded
+    """
+    return b'{"schema":' + content + b',"related":' + encode_related_schemas(related_models, builder,
+                                                                              format_style) + b'}'
+
+
+def clear_relation_graph(**kwargs):
+    """
+    Signal receiver, drops the relation graph and the related models.
+    """
+    get_relation_graph.cache_clear()
+    get_related_models.cache_clear()
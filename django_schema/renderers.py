@@ -0,0 +1,184 @@
+"""
+Schema style renderers.
+
+Each style selected by the ``<style>`` url segment is a StyleRenderer holding the field renderers of the style keyed by
+(element type, widget type, form field type). A field renderer is either the name of a method of the schema view or a
+callable ``renderer(view, field_name, values)`` returning ``{field_name: {...}}``.
+
+Third party field types plug in by registering a renderer on the style::
+
+    from django_schema.renderers import get_style_renderer
+
+    def render_tree_field(view, field_name, values):
+        ...
+
+    get_style_renderer('one').register(render_tree_field, 'select', form_field_type='TreeNodeChoiceField')
+"""
+
+# Matches every element type, widget type or form field type
+ANY = None
+
+
+class StyleRenderer(object):
+    """
+    Field renderers of one schema style.
+    """
+    name = None
+    default_renderer = None
+
+    def __init__(self):
+        self._renderers = {}
+        # (element type, widget type, form field type) -> renderer, resolved once per key
+        self._resolved = {}
+
+    def register(self, renderer, element_type=ANY, widget_type=ANY, form_field_type=ANY):
+        self._renderers[(element_type, widget_type, form_field_type)] = renderer
+        self._resolved.clear()
+        return renderer
+
+    def resolve(self, element_type, widget_type, form_field_type):
+        """
+        The most specific registered renderer wins, element type and widget type take precedence over the form field
+        type.
+        :return: renderer
+        """
+        key = (element_type, widget_type, form_field_type)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        renderer = self.default_renderer
+        for candidate in [key,
+                          (element_type, widget_type, ANY),
+                          (element_type, ANY, form_field_type),
+                          (element_type, ANY, ANY),
+                          (ANY, ANY, form_field_type)]:
+            if candidate in self._renderers:
+                renderer = self._renderers[candidate]
+                break
+        self._resolved[key] = renderer
+        return renderer
+
+    def render_field(self, view, field_name, values):
+        html_form_element = values['html_form_element'] or {}
+        renderer = self.resolve(html_form_element.get('element_type'),
+                                # textarea does not have type
+                                html_form_element.get('widget', {}).get('type'),
+                                html_form_element.get('form_field_type'))
+        if callable(renderer):
+            return renderer(view, field_name, values)
+        return getattr(view, renderer)(field_name, values)
+
+    def render(self, view, schema):
+        """
+        :param view: schema view providing the field renderers
+        :param schema: default style schema of one model
+        :return: schema in this style
+        """
+        raise NotImplementedError
+
+    def project(self, rendered_schema, names):
+        """
+        :param rendered_schema: schema of every field of the model in this style
+        :param names: field names to keep
+        :return: schema with only the given fields
+        """
+        raise NotImplementedError
+
+
+class StyleOneRenderer(StyleRenderer):
+    name = 'one'
+    default_renderer = 'get_unknown_form_element_values_style_one'
+
+    def render(self, view, schema):
+        app_name = list(schema.keys())[0]
+        model = list(schema[app_name]['models'])[0]
+        form_name = model
+        form_fields = schema[app_name]['models'][form_name]['properties']
+        raw_schema = {
+            form_name:{
+                "attrs":{
+                    "visible":False,
+                    "action":"",
+                    "method":"",
+                    "size":"mini",
+                    "label-width":"150px",
+                    "label-position":"right",
+                    "inline":False,
+                    "id":form_name,
+                    "ref":form_name,
+                    "rules":{}
+                },
+                "FormFields":{}
+            }
+        }
+
+        field_rules = {}
+
+        for field, values in form_fields.items():
+            # fields without form field (AutoField) does not have html_form_element
+            form_field_type = (values['html_form_element'] or {}).get('form_field_type')
+            field_and_values = self.render_field(view, field, values)
+            field_rules.update({
+                field:[]
+            })
+
+            field_and_values[field].update({
+                'form_field_type_for_reference':form_field_type,
+                'help_text':values['help_text']
+            })
+            raw_schema[form_name]['FormFields'].update(field_and_values)
+        raw_schema[form_name]['attrs']['rules'] = field_rules
+        return raw_schema
+
+    def project(self, rendered_schema, names):
+        form_name = list(rendered_schema)[0]
+        attrs = dict(rendered_schema[form_name]['attrs'])
+        attrs['rules'] = {name:[] for name in names}
+        return {
+            form_name:{
+                'attrs':attrs,
+                'FormFields':{name:rendered_schema[form_name]['FormFields'][name] for name in names}
+            }
+        }
+
+
+style_one = StyleOneRenderer()
+style_one.register('get_form_input_simple_array_field_style_one', 'input', 'text', 'SimpleArrayField')
+style_one.register('get_form_input_image_field_style_one', 'input', 'file', 'ImageField')
+style_one.register('get_form_input_text_style_one', 'input', 'text')
+style_one.register('get_form_element_textarea_style_one', 'textarea')
+style_one.register('get_form_input_checkbox_style_one', 'input', 'checkbox')
+style_one.register('get_form_input_url_style_one', 'input', 'url')
+style_one.register('get_form_input_email_style_one', 'input', 'email')
+style_one.register('get_form_input_number_style_one', 'input', 'number')
+style_one.register('get_form_input_date_style_one', 'input', 'date')
+style_one.register('get_form_input_time_style_one', 'input', 'time')
+style_one.register('get_form_input_date_time_local_style_one', 'input', 'datetime-local')
+style_one.register('get_form_element_select_typed_choice_field_style_one', 'select',
+                   form_field_type='TypedChoiceField')
+style_one.register('get_form_element_select_model_choice_field_style_one', 'select',
+                   form_field_type='ModelChoiceField')
+style_one.register('get_form_element_select_model_tree_node_multiple_choice_field_style_one', 'select',
+                   form_field_type='TreeNodeMultipleChoiceField')
+style_one.register('get_form_element_select_tree_node_choice_field_style_one', 'select',
+                   form_field_type='TreeNodeChoiceField')
+
+STYLE_RENDERERS = {
+    style_one.name:style_one,
+}
+
+
+def register_style(style_renderer):
+    """
+    Make a new style available on the ``<style>`` url segment.
+    """
+    STYLE_RENDERERS[style_renderer.name] = style_renderer
+    return style_renderer
+
+
+def get_style_renderer(name):
+    """
+    :return: StyleRenderer of the style, None for the default style and unknown styles
+    """
+    return STYLE_RENDERERS.get(name)
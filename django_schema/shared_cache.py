@@ -0,0 +1,101 @@
+"""
+Compiled schemas shared between the worker processes through a Django cache backend.
+
+SCHEMA_CACHE_ALIAS names the cache of ``CACHES`` to use, the shared cache is not used when it is not set.
+SCHEMA_CACHE_TIMEOUT is the timeout of the entries in seconds, None keeps them until the cache evicts them.
+Each style of a model is one entry keyed by the builder, the model definition hash, a digest of the package version and
+of the settings the schema depends on, and the style. A changed model, an upgrade or a changed setting gets new keys and
+the old entries expire.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import NoReverseMatch, reverse
+
+from .app_index import get_version_prefixes
+from .artifacts import get_builder_path, get_model_definition_hash
+from .choices import get_choices_inline_limit
+from .compiler import DEFAULT_STYLE, CompiledModelSchema, get_schema_styles
+
+DEFAULT_TIMEOUT = 24 * 60 * 60
+KEY_PREFIX = 'django_schema'
+
+
+def get_schema_cache_alias():
+    return getattr(settings, 'SCHEMA_CACHE_ALIAS', None)
+
+
+def get_schema_cache_timeout():
+    return getattr(settings, 'SCHEMA_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def get_settings_digest():
+    """
+    :return: hex digest of the package version and of the settings written into the compiled schemas: the choices
+    inline limit, the app names, the models with a choices url and the url the api is mounted on
+    """
+    from . import __version__
+
+    try:
+        choices_url = reverse('django_schema:field-choices', kwargs={
+            'app_name':'app',
+            'model_name':'model',
+            'field_name':'field',
+        })
+    except NoReverseMatch:
+        choices_url = None
+    values = [
+        __version__,
+        get_choices_inline_limit(),
+        list(settings.SCHEMA_APPS),
+        list(get_version_prefixes()),
+        list(getattr(settings, 'SCHEMA_CHOICES_MODELS', [])),
+        choices_url,
+    ]
+    return hashlib.sha1(json.dumps(values).encode('utf-8')).hexdigest()
+
+
+class SharedSchemaCache(object):
+    """
+    Read and write the compiled schemas of a Django cache.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.cache = caches[alias]
+
+    def get_keys(self, model, builder):
+        """
+        :return: {style: cache key}
+        """
+        definition_hash = get_model_definition_hash(model)
+        builder_path = get_builder_path(builder)
+        settings_digest = get_settings_digest()
+        return {
+            style:f'{KEY_PREFIX}:{builder_path}:{model._meta.label}:{definition_hash}:{settings_digest}:{style}'
+            for style in get_schema_styles()
+        }
+
+    def load_compiled_schema(self, model, builder, keys=None):
+        """
+        :return: CompiledModelSchema, None when a style of the model is missing from the cache
+        """
+        keys = keys or self.get_keys(model, builder)
+        values = self.cache.get_many(list(keys.values()))
+        if len(values) != len(keys):
+            return None
+        default = values[keys[DEFAULT_STYLE]]
+        rendered_schemas = {style:values[key] for style, key in keys.items() if style != DEFAULT_STYLE}
+        return CompiledModelSchema(default['schema'], rendered_schemas, default['lookup'])
+
+    def store_compiled_schema(self, model, builder, compiled_schema, keys=None):
+        keys = keys or self.get_keys(model, builder)
+        values = {}
+        for style, key in keys.items():
+            if style == DEFAULT_STYLE:
+                values[key] = {'schema':compiled_schema.project(), 'lookup':compiled_schema.lookup}
+            else:
+                values[key] = compiled_schema.rendered_schemas[style]
+        self.cache.set_many(values, timeout=get_schema_cache_timeout())
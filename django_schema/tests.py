@@ -1,3 +1,76 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .json_schema import JsonSchemaRenderer
+
+
+def get_field_values(key, form_field_type, data_type):
+    """
+    :return: field data in the default style, as written by ``_get_field_data``
+    """
+    return {
+        'related_model':'',
+        'is_related':False,
+        'key':key,
+        'data_type':data_type,
+        'model_field_type':data_type,
+        'min_length':'',
+        'max_length':None,
+        'choices':[],
+        'label':key.title(),
+        'required':True,
+        'default':None,
+        'help_text':'',
+        'form_field_type':form_field_type,
+        'html_form_element':{
+            'element_type':'input',
+            'form_field_type':form_field_type,
+            'widget':{'type':'date'},
+        },
+        'is_in_default_model_form_fields':True,
+    }
+
+
+def get_default_schema(fields):
+    return {
+        'blog':{
+            'app_name':'blog',
+            'full_name':'blog',
+            'models':{
+                'Post':{
+                    'model_name':'Post',
+                    'properties':fields,
+                }
+            }
+        }
+    }
+
+
+class JsonSchemaRendererTests(SimpleTestCase):
+
+    def test_shared_shape_without_type(self):
+        def render_date_field(view, field_name, values):
+            return {field_name:{'format':'date', 'maxLength':10}}
+
+        renderer = JsonSchemaRenderer()
+        renderer.register(render_date_field, form_field_type='DateField')
+        json_schema = renderer.render(None, get_default_schema({
+            'published':get_field_values('published', 'DateField', 'DateField'),
+            'updated':get_field_values('updated', 'DateField', 'DateField'),
+        }))
+
+        self.assertEqual(json_schema['$defs'], {'format_date.maxLength_10':{'format':'date', 'maxLength':10}})
+        self.assertEqual(json_schema['properties']['published'], {'$ref':'#/$defs/format_date.maxLength_10'})
+        self.assertEqual(json_schema['properties']['updated'], {'$ref':'#/$defs/format_date.maxLength_10'})
+
+    def test_shape_used_once_stays_inline(self):
+        def render_date_field(view, field_name, values):
+            return {field_name:{'format':'date', 'maxLength':10}}
+
+        renderer = JsonSchemaRenderer()
+        renderer.register(render_date_field, form_field_type='DateField')
+        json_schema = renderer.render(None, get_default_schema({
+            'published':get_field_values('published', 'DateField', 'DateField'),
+        }))
+
+        self.assertEqual(json_schema['$defs'], {})
+        self.assertEqual(json_schema['properties']['published'], {'format':'date', 'maxLength':10})
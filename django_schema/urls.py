@@ -1,6 +1,7 @@
-from django.urls import path, include
+from django.urls import URLResolver, path
+from django.urls.resolvers import RoutePattern
 
-from .views import LocalInstallApps, ModelsOfLocalApp, LocalInstallAppsStyleOne, SchemaIndexView
+from .views import LocalInstallApps, ModelsOfLocalApp, LocalInstallAppsStyleOne, SchemaIndexView, SchemaExport
 
 app_name = 'django_schema'
 
@@ -10,9 +11,12 @@ urlpatterns = [
     path('local-apps/style/one/', LocalInstallAppsStyleOne.as_view(), name='local-apps-style-one'),
     path('local-apps/<app_name>/', ModelsOfLocalApp.as_view(), name='models-of-local-apps'),
     path('local-apps/<app_name>/style/<style>/', ModelsOfLocalApp.as_view(), name='models-of-local-apps-style-one'),
+    path('export/', SchemaExport.as_view(), name='schema-export'),
+    path('export/style/<style>/', SchemaExport.as_view(), name='schema-export-style'),
 
 ]
 
+# The api urlconf is given by name so Django REST framework is only imported when the api urls are first resolved
 urlpatterns += [
-    path('api/', include('django_schema.api.urls'))
+    URLResolver(RoutePattern('api/'), 'django_schema.api.urls')
 ]
@@ -1,16 +1,25 @@
 # Create your views here.
-import datetime
 from collections import namedtuple
 
-import namedtupled
 from django.apps import apps
 from django.conf import settings
-from django.contrib.postgres.fields import ArrayField
-from django.contrib.postgres.forms import SimpleArrayField
 from django.core.exceptions import FieldDoesNotExist
-from django.forms import ModelForm, DateTimeField
-from django.http import JsonResponse
-from django.views.generic import TemplateView
+from django.forms import DateTimeField
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.views.generic import TemplateView, View
+
+from .app_index import get_app_model_index
+from .choices import format_choices, get_choices_reference, get_choices_url, get_static_choices
+from .compiler import schema_registry
+from .defaults import fill_callable_defaults, get_callable_default_marker, get_schema_etag
+from .delta import delta_response
+from .encoders import JSON_CONTENT_TYPE, encode_json
+from .forms import get_model_form_class, get_model_form_fields
+from .introspection import FieldDescriptor, FieldSnapshot, get_app_field_listing, is_simple_array_field
+from .profiling import profiled
+from .relations import encode_nested_schema, get_related_models, get_relation_depth
+from .renderers import get_style_renderer
+from .timing import phase, server_timing
 
 INTERNAL_TYPES = [
     "BigIntegerField",
@@ -51,18 +60,6 @@ HTML_INPUT_ELEMENT_TYPE = [
 ]
 
 
-def get_model_form_fields(meta_model):
-    class DynamicModelForm(ModelForm):
-        class Meta:
-            model = meta_model
-            fields = "__all__"
-
-    form = DynamicModelForm()
-    form_fields = set(form.fields)
-
-    return form_fields
-
-
 class PlainDictionaryToObject(object):
     @staticmethod
     def map(data, nested=False):
@@ -70,9 +67,11 @@ class PlainDictionaryToObject(object):
 
 
 def get_formatted_app_name(app_name):
-    # ToDo @bikesh "Just in case if you are are versioning your apps like apps/v1/ need to make this dynamic and optimise  "
-    app_name = app_name.split("apps.v1.")[-1]
-    return app_name
+    """
+    :param app_name: full name of the app, 'apps.v1.core'
+    :return: name without the version prefix of SCHEMA_APP_VERSION_PREFIXES, 'core'
+    """
+    return get_app_model_index().format_app_name(app_name)
 
 
 def get_models(app_name):
@@ -83,34 +82,23 @@ def get_models(app_name):
         name = 'core'
     :param app_name: 'core'
     :return: "List of models linked with this app
+    :raise LookupError: unknown app
     """
-    try:
-        _models = list(apps.get_app_config(app_name).get_models())
-        return _models
-    except:
-        raise LookupError(f"this is no such app {app_name}")
+    return list(get_app_model_index().get_app_config(app_name).get_models())
 
 
 def get_local_apps():
     """
     :return: List of all the installed Local Apps assign to Variable LOCAL_APPS in settings file
     """
-
-    local_apps = settings.SCHEMA_APPS
-    local_apps = [get_formatted_app_name(x) for x in local_apps]
-    return local_apps
+    return get_app_model_index().get_local_apps()
 
 
 def get_apps_and_models():
     """
     :return:  All the local apps and it's associate models.
     """
-    local_apps = get_local_apps()
-    apps_and_models = {
-        name:list(get_models(name)) for name in local_apps
-    }
-
-    return apps_and_models
+    return get_app_model_index().get_apps_and_models()
 
 
 class LocalInstallApps(TemplateView):
@@ -136,35 +124,13 @@ class ModelsOfLocalApp(TemplateView):
         ctx = super().get_context_data(**kwargs)
         app_name = kwargs.get('app_name')
         _models = get_models(app_name)
-
-        forms = {}
-        for _model in _models:
-            fields = _model._meta.get_fields()
-
-            class DynamicModelForm(ModelForm):
-                class Meta:
-                    model = _model
-                    fields = '__all__'
-
-            model_form_fields = DynamicModelForm().fields
-            for f in fields:
-                setattr(f, 'is_in_default_model_form_fields', True if f.name in model_form_fields else False)
-            forms.update({
-                _model.__name__:fields
-            })
-        ctx['forms'] = forms
+        ctx['forms'] = get_app_field_listing(tuple(_models))
 
         if hasattr(settings, 'MODEL_SCHEMA_TEST'):
             test_app_name = settings.MODEL_SCHEMA_TEST['app_name']
             test_model_name = settings.MODEL_SCHEMA_TEST['model']
             test_model = apps.get_model(app_label=test_app_name, model_name=test_model_name)
-
-            class GenericModelForm(ModelForm):
-                class Meta:
-                    model = test_model
-                    fields = '__all__'
-
-            test_model_form = GenericModelForm()
+            test_model_form = get_model_form_class(test_model)()
             ctx['test_model_form'] = test_model_form
             ctx['fields'] = test_model._meta.get_fields()
 
@@ -172,16 +138,30 @@ class ModelsOfLocalApp(TemplateView):
 
         return ctx
 
+    @profiled
+    @server_timing
     def post(self, request, *args, **kwargs):
-        context = self.get_context_data(**kwargs)
         app_name = kwargs.get('app_name', None)
         schema_style = kwargs.get('style', None)
-        app_config = apps.get_app_config(app_name)
-        model_name = request.POST['model-name']
-        model = app_config.get_model(model_name)
+        with phase('lookup'):
+            index = get_app_model_index()
+            model_name = request.POST['model-name']
+            try:
+                app_config = index.get_app_config(app_name)
+                model = index.get_model(app_config.label, model_name)
+            except LookupError as e:
+                raise Http404(str(e))
         fields = request.POST.keys()
-        default_schema = self.get_default_schema_for_model(app_config, model, fields, schema_style)
-        return default_schema
+        try:
+            depth = get_relation_depth(request.POST.get('schema-depth'))
+        except ValueError:
+            return HttpResponseBadRequest("schema-depth must be a number")
+        if depth:
+            default_schema = self.get_nested_schema_for_model(app_config, model, fields, schema_style, depth,
+                                                              reverse=bool(request.POST.get('schema-reverse')))
+        else:
+            default_schema = self.get_default_schema_for_model(app_config, model, fields, schema_style)
+        return delta_response(request, default_schema, schema_registry.last_modified, 'SCHEMA_MODEL_CACHE_CONTROL')
 
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -189,20 +169,51 @@ class ModelsOfLocalApp(TemplateView):
     def get_default_schema_for_model(self, app, model, fields, format_style=None):
         """
         This method will called when user submit the form. From the form we will get, model, selected fields and data_format style
+        The schema of the model is compiled once and the selected fields are projected out of the compiled schema.
         :param app: App name
         :param model: Model object
         :param fields: selected fields from the model
         :param format_style: Format style of json response
         :return: schema
         """
+        compiled_schema = schema_registry.get_compiled_schema(app, model, self)
+        content, etag = compiled_schema.get_encoded(fields, format_style)
+        response = HttpResponse(fill_callable_defaults(content), content_type=JSON_CONTENT_TYPE)
+        response['ETag'] = etag
+        return response
+
+    def get_nested_schema_for_model(self, app, model, fields, format_style=None, depth=1, reverse=False):
+        """
+        Schema of the selected fields with the schema of every model of the SCHEMA_APPS reachable within depth relations
+        from them, see relations.py
+        :param reverse: follow the reverse relations too
+        :return: {"schema", "related"}
+        """
+        compiled_schema = schema_registry.get_compiled_schema(app, model, self)
+        field_names = frozenset(compiled_schema.get_field_names(fields))
+        index = get_app_model_index()
+        related_models = [
+            related_model for related_model in get_related_models(model, depth, reverse, field_names)
+            if index.is_local_app(related_model._meta.app_label)
+        ]
+        content = encode_nested_schema(compiled_schema.get_encoded(fields, format_style)[0], related_models, self,
+                                       format_style)
+        response = HttpResponse(fill_callable_defaults(content), content_type=JSON_CONTENT_TYPE)
+        response['ETag'] = get_schema_etag(content)
+        return response
+
+    def build_default_schema(self, app, model, fields):
+        """
+        Build the default style schema by introspecting the given fields of the model.
+        :param app: App name
+        :param model: Model object
+        :param fields: fields from the model
+        :return: schema
+        """
 
         app_name = get_formatted_app_name(app.name)
         model_name = model.__name__
-        meta_model = model
 
-        form_fields = get_model_form_fields(meta_model)
-        selected_fields = set(fields)
-        final_fields = selected_fields.intersection(form_fields)
         schema = {
             app_name:{
                 'app_name':app_name,
@@ -221,89 +232,22 @@ class ModelsOfLocalApp(TemplateView):
         for _field in fields:
             schema[app_name]['models'][model_name]["properties"].update(self.get_field_data(model, _field))
 
-        if format_style in ['one']:
-            formatted_schema = self.get_schema_format_style_one(schema)
-            return JsonResponse(formatted_schema)
+        return schema
 
-        return JsonResponse(schema)
+    def get_schema_format_style(self, schema, format_style):
+        """
+        :param schema: default style schema of one model
+        :param format_style: name of a registered style, see renderers.py
+        :return: schema in the given style, the default schema for unknown styles
+        """
+        style_renderer = get_style_renderer(format_style)
+        if style_renderer is None:
+            return schema
+        with phase('render'):
+            return style_renderer.render(self, schema)
 
     def get_schema_format_style_one(self, schema):
-        app_name = list(schema.keys())[0]
-        model = list(schema[app_name]['models'])[0]
-        form_name = model
-        form_fields = schema[app_name]['models'][form_name]['properties']
-        raw_schema = {
-            form_name:{
-                "attrs":{
-                    "visible":False,
-                    "action":"",
-                    "method":"",
-                    "size":"mini",
-                    "label-width":"150px",
-                    "label-position":"right",
-                    "inline":False,
-                    "id":form_name,
-                    "ref":form_name,
-                    "rules":{}
-                },
-                "FormFields":{}
-            }
-        }
-
-        field_rules = {}
-
-        for field, values in form_fields.items():
-            element_type = values['html_form_element']['element_type']
-            form_field_type = values['html_form_element']['form_field_type']
-            # textarea does not have type
-            widget_type = values['html_form_element']['widget'].get('type')
-            field_and_values = {}
-            if element_type == 'input' and widget_type == 'text' and form_field_type == 'SimpleArrayField':
-                field_and_values = self.get_form_input_simple_array_field_style_one(field, values)
-            if element_type == 'input' and widget_type == 'file' and form_field_type == 'ImageField':
-                field_and_values = self.get_form_input_image_field_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'text':
-                field_and_values = self.get_form_input_text_style_one(field, values)
-            elif element_type == 'textarea':
-                field_and_values = self.get_form_element_textarea_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'checkbox':
-                field_and_values = self.get_form_input_checkbox_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'url':
-                field_and_values = self.get_form_input_url_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'email':
-                field_and_values = self.get_form_input_email_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'number':
-                field_and_values = self.get_form_input_number_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'date':
-                field_and_values = self.get_form_input_date_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'time':
-                field_and_values = self.get_form_input_time_style_one(field, values)
-            elif element_type == 'input' and widget_type == 'datetime-local':
-                field_and_values = self.get_form_input_date_time_local_style_one(field, values)
-            elif element_type == 'select' and form_field_type == 'TypedChoiceField':
-                field_and_values = self.get_form_element_select_typed_choice_field_style_one(field, values)
-            elif element_type == 'select' and form_field_type == 'ModelChoiceField':
-                field_and_values = self.get_form_element_select_model_choice_field_style_one(field, values)
-            elif element_type == 'select' and form_field_type == 'TreeNodeMultipleChoiceField':
-                field_and_values = self.get_form_element_select_model_tree_node_multiple_choice_field_style_one(field,
-                                                                                                                values)
-            elif element_type == 'select' and form_field_type == 'TreeNodeChoiceField':
-                field_and_values = self.get_form_element_select_tree_node_choice_field_style_one(field,
-                                                                                                 values)
-
-            else:
-                field_and_values = self.get_unknown_form_element_values_style_one(field, values)
-            field_rules.update({
-                field:[]
-            })
-
-            field_and_values[field].update({
-                'form_field_type_for_reference':form_field_type,
-                'help_text':values['help_text']
-            })
-            raw_schema[form_name]['FormFields'].update(field_and_values)
-        raw_schema[form_name]['attrs']['rules'] = field_rules
-        return raw_schema
+        return self.get_schema_format_style(schema, 'one')
 
     def get_form_input_text_style_one(self, field_name, field_attrs):
         '''
@@ -449,7 +393,7 @@ class ModelsOfLocalApp(TemplateView):
         '''
         field = self.get_field_values(field_attrs)
         ## Extract only values of the field name
-        base_field_reduced_attrs = namedtupled.reduce(field.base_field)[field_name]
+        base_field_reduced_attrs = field.base_field[field_name]
         base_element_type = base_field_reduced_attrs['html_form_element']['element_type']
         base_element_widget_type = base_field_reduced_attrs['html_form_element']['widget']['type']
         base_field_attr = {}
@@ -822,7 +766,8 @@ class ModelsOfLocalApp(TemplateView):
                         "collapse-tags":True,
                         "is_model_choice_field":False
                     },
-                    "choices":self.get_choices(field.html_form_element.widget.choices)
+                    # already formatted by get_html_element_data
+                    "choices":field.html_form_element.widget.choices
                 },
                 "default":field.default,
             },
@@ -881,6 +826,7 @@ class ModelsOfLocalApp(TemplateView):
                         "multiple":field.html_form_element.widget.allow_multiple_selected,
                         "placeholder":field.placeholder,
                         "can_be_autocomplete":field.html_form_element.widget.can_be_autocomplete,
+                        "choices_url":field.html_form_element.widget.choices_url,
                         "set_id_on_form_save":field.html_form_element.widget.set_id_on_form_save,
                         "collapse-tags":True,
                         "is_model_choice_field":True
@@ -936,6 +882,7 @@ class ModelsOfLocalApp(TemplateView):
                         "multiple":field.html_form_element.widget.allow_multiple_selected,
                         "placeholder":field.placeholder,
                         "can_be_autocomplete":field.html_form_element.widget.can_be_autocomplete,
+                        "choices_url":field.html_form_element.widget.choices_url,
                         "set_id_on_form_save":field.html_form_element.widget.set_id_on_form_save,
                         "collapse-tags":True,
                         "is_model_choice_field":True
@@ -990,6 +937,7 @@ class ModelsOfLocalApp(TemplateView):
                         "multiple":field.html_form_element.widget.allow_multiple_selected,
                         "placeholder":field.placeholder,
                         "can_be_autocomplete":field.html_form_element.widget.can_be_autocomplete,
+                        "choices_url":field.html_form_element.widget.choices_url,
                         "set_id_on_form_save":field.html_form_element.widget.set_id_on_form_save,
                         "collapse-tags":True,
                         "is_model_choice_field":True
@@ -1052,8 +1000,8 @@ class ModelsOfLocalApp(TemplateView):
                         "placeholder":field.placeholder,
                         "id":field.id,
                         "autosize":{
-                            "minRows":field.html_form_element.widget.attrs.rows,
-                            "maxRows":field.html_form_element.widget.attrs.rows
+                            "minRows":field.html_form_element.widget.attrs.get('rows'),
+                            "maxRows":field.html_form_element.widget.attrs.get('rows')
                         }
                     }
                 },
@@ -1064,22 +1012,22 @@ class ModelsOfLocalApp(TemplateView):
         return final_schema
 
     def get_field_values(self, values):
+        """
+        :param values: field data collected by _get_field_data
+        :return: FieldDescriptor used by the style renderers
+        """
         key = values['key']
         label = values.get('label', key).title()
-        data = {
-            'key':key,
-            'label':label,
-            'is_required':values.get('required'),
-            'placeholder':values.get('default', f'Please provide {label}'),
-            'default':values.get('default'),
-            'max_length':values.get('max_length', 0),
-            'min_length':values.get('min_length', 0),
-            'id':key,
-            'name':key,
-        }
-        values.update(data)
-        data = namedtupled.map(values)
-        return data
+        return FieldDescriptor(
+            key=key,
+            label=label,
+            is_required=values.get('required'),
+            placeholder=values.get('default', f'Please provide {label}'),
+            default=values.get('default'),
+            max_length=values.get('max_length', 0),
+            min_length=values.get('min_length', 0),
+            values=values,
+        )
 
     def get_unknown_form_element_values_style_one(self, field_name, values):
         field = self.get_field_values(values)
@@ -1109,22 +1057,25 @@ class ModelsOfLocalApp(TemplateView):
         return final_schema
 
     def get_choices(self, choices):
-        options = []
-        for k, v in choices:
-            options.append({
-                "label":v,
-                "value":k,
-            })
-
-        return options
+        return format_choices(choices)
 
-    def get_html_element_data(self, field):
-        try:
-            widget = field.formfield().widget
-        except:
-            widget = ''
-        form_field_type = field.formfield().__class__.__name__
-        widget_class = widget.__class__.__name__
+    def get_field_choices(self, field_obj, widget=False, choices=None):
+        """
+        :param field_obj: model field
+        :param widget: choices of the form widget instead of the model field
+        :param choices: choices of the form widget
+        :return: formatted choices, or a reference to the choices resource for long lists
+        """
+        formatted = get_static_choices(field_obj, widget, choices)
+        reference = get_choices_reference(field_obj, formatted, widget)
+        if reference is not None:
+            return reference
+        return list(formatted)
+
+    def get_html_element_data(self, snapshot):
+        widget = snapshot.widget
+        form_field_type = snapshot.form_field_type
+        widget_class = snapshot.widget_class
         if widget:
             data = {
                 'element_type':'',
@@ -1148,8 +1099,9 @@ class ModelsOfLocalApp(TemplateView):
                     data['widget']['can_be_autocomplete'] = True
                     data['widget']['set_id_on_form_save'] = True
                     data['widget']['form_field_type_for_reference'] = form_field_type
+                    data['widget']['choices_url'] = get_choices_url(snapshot.field)
                 else:
-                    data['widget']['choices'] = self.get_choices(widget.choices)
+                    data['widget']['choices'] = self.get_field_choices(snapshot.field, True, widget.choices)
 
             if hasattr(widget, 'input_type'):
                 input_type = widget.input_type
@@ -1178,83 +1130,70 @@ class ModelsOfLocalApp(TemplateView):
         else:
             return ''
 
-    def get_field_label(self, field):
-        label = ''
-        try:
-            label = field.formfield().label
-        except:
-            pass
-        return label
+    def get_field_label(self, snapshot):
+        return getattr(snapshot.form_field, 'label', '')
 
-    def get_field_is_required(self, field):
-        required = ''
-        try:
-            required = field.formfield().required
-        except:
-            pass
-        return required
+    def get_field_is_required(self, snapshot):
+        return getattr(snapshot.form_field, 'required', '')
 
-    def get_field_default(self, field):
-        initial = ''
-        try:
-            initial = field.formfield().initial
-            if callable(initial):
-                if isinstance(field.formfield(), DateTimeField):
-                    if isinstance(initial(), datetime.datetime):
-                        initial = initial().strftime("%Y-%m-%d %H:%I:%S %Z")
-                else:
-                    # need to handle other initials
-                    initial = ''
-        except:
-            pass
+    def get_field_default(self, snapshot):
+        form_field = snapshot.form_field
+        initial = getattr(form_field, 'initial', '')
+        if callable(initial):
+            if isinstance(form_field, DateTimeField):
+                # the value is written on every response, see defaults.py
+                initial = get_callable_default_marker(snapshot.field)
+            else:
+                # need to handle other initials
+                initial = ''
         return initial
 
-    def get_field_help_text(self, field):
-        help_text = ''
-        try:
-            help_text = field.formfield().help_text
-        except:
-            pass
-        return help_text
+    def get_field_help_text(self, snapshot):
+        return getattr(snapshot.form_field, 'help_text', '')
 
     def get_field_data(self, model, field_name):
         data = {}
         try:
-            model_form_fields = get_model_form_fields(model)
             field_obj = model._meta.get_field(field_name)
-            internal_type = field_obj.get_internal_type()
-            data = self._get_field_data(model, field_obj)
-            if hasattr(field_obj, 'base_field') and isinstance(field_obj, ArrayField) and isinstance(
-                    field_obj.formfield(),
-                    SimpleArrayField):
-                data[field_name].update({
-                    'base_field':self._get_field_data(model, field_obj.base_field)
-                })
+            with phase('introspection'):
+                snapshot = FieldSnapshot(field_obj)
+                data = self._get_field_data(model, field_obj, snapshot)
+                if is_simple_array_field(snapshot):
+                    data[field_name].update({
+                        'base_field':self._get_field_data(model, field_obj.base_field)
+                    })
         except FieldDoesNotExist:
             pass
 
         return data
 
-    def _get_field_data(self, model, field_obj):
+    def _get_field_data(self, model, field_obj, snapshot=None):
+        """
+        :param model: Model object
+        :param field_obj: Model field
+        :param snapshot: FieldSnapshot of field_obj, created when not given
+        :return: field data
+        """
         model_form_fields = get_model_form_fields(model)
-        # field = model._meta.get_field(field)
+        if snapshot is None:
+            snapshot = FieldSnapshot(field_obj)
         internal_type = field_obj.get_internal_type()
         data = {
             field_obj.name:{
-                "related_model":"",
+                "related_model":field_obj.related_model._meta.label if field_obj.related_model else "",
                 "is_related":field_obj.is_relation,
                 "key":field_obj.name,
                 "data_type":internal_type,
                 "model_field_type":internal_type,
                 "min_length":field_obj.min_length if hasattr(field_obj, 'min_length') else '',
                 "max_length":field_obj.max_length,
-                "choices":self.get_choices(field_obj.choices),
-                "label":self.get_field_label(field_obj),
-                "required":self.get_field_is_required(field_obj),
-                "default":self.get_field_default(field_obj),
-                "help_text":self.get_field_help_text(field_obj),
-                "form_field_type":field_obj.formfield().__class__.__name__,
-                "html_form_element":self.get_html_element_data(field_obj),
+                "choices":self.get_field_choices(field_obj),
+                "label":self.get_field_label(snapshot),
+                "required":self.get_field_is_required(snapshot),
+                "default":self.get_field_default(snapshot),
+                "help_text":self.get_field_help_text(snapshot),
+                "form_field_type":snapshot.form_field_type,
+                "html_form_element":self.get_html_element_data(snapshot),
                 "is_in_default_model_form_fields":True if field_obj.name in model_form_fields else False
                 ## Is in ModelForm field which return __all__
             }
@@ -1262,6 +1201,73 @@ class ModelsOfLocalApp(TemplateView):
         return data
 
 
+class SchemaExport(View):
+    """
+    Stream the schema of every model of one app, several apps (?app=blog&app=users) or all the SCHEMA_APPS.
+    ?format=ndjson (default) writes one {"app_name", "model_name", "schema"} object per line, ?format=json writes a
+    single object keyed by app and model name. Each model is written as soon as its schema is ready so the memory stays flat.
+    """
+    schema_view_class = ModelsOfLocalApp
+    formats = {
+        'ndjson':'application/x-ndjson',
+        'json':'application/json',
+    }
+
+    def get(self, request, *args, **kwargs):
+        output_format = request.GET.get('format', 'ndjson')
+        if output_format not in self.formats:
+            raise Http404(f"Unknown format {output_format}")
+        schema_style = kwargs.get('style', None)
+        app_names = request.GET.getlist('app') or get_local_apps()
+        try:
+            # dict drops the apps given twice, by the same or another name
+            app_configs = list(dict.fromkeys(get_app_model_index().get_app_config(name) for name in app_names))
+        except LookupError as e:
+            raise Http404(str(e))
+
+        if output_format == 'json':
+            content = self.stream_json(app_configs, schema_style)
+        else:
+            content = self.stream_ndjson(app_configs, schema_style)
+        return StreamingHttpResponse(content, content_type=self.formats[output_format])
+
+    def get_model_schemas(self, app_configs, format_style=None):
+        """
+        :return: generator of (app_config, model, schema) with the schema of all the fields of each model
+        """
+        schema_view = self.schema_view_class()
+        for app_config in app_configs:
+            for model in app_config.get_models():
+                compiled_schema = schema_registry.get_compiled_schema(app_config, model, schema_view)
+                yield app_config, model, compiled_schema.get_encoded(format_style=format_style)[0]
+
+    def encode(self, data):
+        return encode_json(data)
+
+    def stream_ndjson(self, app_configs, format_style=None):
+        for app_config, model, schema in self.get_model_schemas(app_configs, format_style):
+            # the schema of the styles does not carry the app name
+            yield (b'{"app_name":' + self.encode(get_formatted_app_name(app_config.name)) +
+                   b',"model_name":' + self.encode(model.__name__) +
+                   b',"schema":' + fill_callable_defaults(schema) + b'}\n')
+
+    def stream_json(self, app_configs, format_style=None):
+        yield b'{'
+        current_app = None
+        for app_config, model, schema in self.get_model_schemas(app_configs, format_style):
+            if app_config is not current_app:
+                if current_app is not None:
+                    yield b'},'
+                yield self.encode(get_formatted_app_name(app_config.name)) + b':{'
+                current_app = app_config
+                separator = b''
+            yield separator + self.encode(model.__name__) + b':' + fill_callable_defaults(schema)
+            separator = b','
+        if current_app is not None:
+            yield b'}'
+        yield b'}'
+
+
 class LocalInstallAppsStyleOne(LocalInstallApps):
 
     def get_context_data(self, **kwargs):
@@ -0,0 +1,115 @@
+"""
+Background warm-up of the compiled schemas, enabled with SCHEMA_WARM_UP = True.
+
+A thread compiling the schema of every model of the SCHEMA_APPS is started by the first request of each process (or the
+readiness probe), so it runs in the workers forked by a preloading server and not in the management commands.
+Requests for a model which is not warmed yet compile it on demand as without warm-up.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from .app_index import get_app_model_index
+from .compiler import schema_registry
+
+logger = logging.getLogger(__name__)
+
+IDLE = 'idle'
+RUNNING = 'running'
+DONE = 'done'
+
+
+def is_warm_up_enabled():
+    return getattr(settings, 'SCHEMA_WARM_UP', False)
+
+
+class SchemaWarmUp(object):
+    """
+    Progress of the warm-up of the current process, read by the readiness endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.status = IDLE
+        self.total = 0
+        self.warmed = 0
+        self.failed = []
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        # process of the thread, a forked process inherits the progress but not the thread
+        self._pid = None
+
+    def start(self):
+        """
+        Start the warm-up thread, once per process.
+        """
+        if self._pid == os.getpid():
+            return self._thread
+        with self._lock:
+            if self._pid == os.getpid():
+                return self._thread
+            self.reset()
+            self._pid = os.getpid()
+            self.status = RUNNING
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self.run, name='django_schema_warm_up', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def run(self):
+        from .views import ModelsOfLocalApp, get_apps_and_models
+
+        try:
+            builder = ModelsOfLocalApp()
+            apps_and_models = get_apps_and_models()
+            self.total = sum(len(models) for models in apps_and_models.values())
+            for app_name, models in apps_and_models.items():
+                app_config = get_app_model_index().get_app_config(app_name)
+                for model in models:
+                    try:
+                        schema_registry.get_compiled_schema(app_config, model, builder)
+                    except Exception:
+                        # the model is compiled again on demand and fails with a proper error there
+                        logger.exception("Schema warm-up of %s failed", model._meta.label)
+                        self.failed.append(model._meta.label)
+                    else:
+                        self.warmed += 1
+        except Exception:
+            logger.exception("Schema warm-up failed")
+        finally:
+            self.finished_at = time.time()
+            self.status = DONE
+
+    def is_ready(self):
+        """
+        :return: False while the warm-up of this process is running, True when it finished or is disabled
+        """
+        return not is_warm_up_enabled() or (self._pid == os.getpid() and self.status == DONE)
+
+    def get_progress(self):
+        return {
+            'ready':self.is_ready(),
+            'status':self.status,
+            'total':self.total,
+            'warmed':self.warmed,
+            'failed':list(self.failed),
+            'duration':(self.finished_at or time.time()) - self.started_at if self.started_at else None,
+        }
+
+
+schema_warm_up = SchemaWarmUp()
+
+
+def start_warm_up(**kwargs):
+    """
+    Signal receiver of ``request_started``, starts the warm-up of the process.
+    """
+    if is_warm_up_enabled():
+        schema_warm_up.start()
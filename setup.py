@@ -27,14 +27,21 @@ setup(
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Internet :: WWW/HTTP',
     ],
+    # tracemalloc.reset_peak of the profiling
+    python_requires='>=3.9',
     install_requires=[
-        'psycopg2',
-        'namedtupled',
         'django-rest-framework'
-    ]
+    ],
+    extras_require={
+        # ArrayField support
+        'postgres':['psycopg2'],
+        # faster JSON encoding of the schema responses
+        'orjson':['orjson'],
+    }
 )